@@ -16,12 +16,18 @@ class Sprinkler:
 
     On other platforms:
         - logs actions only, so the rest of the pipeline can be tested safely.
+
+    `cooldown` is a global pause after any spray. When spraying is already
+    de-duplicated per location (spray coverage map), callers pass
+    `bypass_cooldown=True` and only the short hardware-protection gap
+    `min_interval` applies, so a nearby infected plant is not skipped.
     """
 
-    def __init__(self, pin, max_duration, cooldown):
+    def __init__(self, pin, max_duration, cooldown, min_interval=2.0):
         self.pin = pin
         self.max_duration = max_duration
         self.cooldown = cooldown
+        self.min_interval = min_interval
         self.last_spray_time = 0
 
         if _HAS_GPIO:
@@ -32,16 +38,18 @@ class Sprinkler:
         else:
             print(f"[MockSprinkler] initialized on pin {self.pin} (no GPIO)")
 
-    def spray(self, decision):
+    def spray(self, decision, bypass_cooldown=False):
+        """Spray according to the decision. Returns True if it sprayed."""
         # decision is expected to be a dict like {"spray": bool, "amount": float}
         if not decision.get("spray"):
             print("[Sprinkler] spray flag is False - skipping")
-            return
+            return False
 
         now = time.time()
-        if now - self.last_spray_time < self.cooldown:
+        gap = self.min_interval if bypass_cooldown else self.cooldown
+        if now - self.last_spray_time < gap:
             print("[Sprinkler] cooldown active - skipping spray")
-            return
+            return False
 
         duration = min(decision.get("amount", 0), self.max_duration)
 
@@ -55,6 +63,7 @@ class Sprinkler:
             time.sleep(duration)
 
         self.last_spray_time = time.time()
+        return True
 
     def cleanup(self):
         if _HAS_GPIO and GPIO is not None:
@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from inference.severity_estimator import SeverityEstimator
+from inference.color_severity import ColorSeverityEstimator
+from decision.decision_engine import decide
+
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def load_leaves(path):
+    """Load leaf crops from an image file or a directory of images.
+
+    Crops are preprocessed the same way as in main_camera.py
+    (Gaussian blur + BGR→RGB).
+    """
+
+    if os.path.isdir(path):
+        files = sorted(
+            os.path.join(path, f)
+            for f in os.listdir(path)
+            if f.lower().endswith(IMAGE_EXTS)
+        )
+    else:
+        files = [path]
+
+    leaves = []
+    for f in files:
+        img = cv2.imread(f)
+        if img is None:
+            print(f"⚠️ Skipping unreadable image: {f}")
+            continue
+        img = cv2.GaussianBlur(img, (5, 5), 0)
+        leaves.append((f, cv2.cvtColor(img, cv2.COLOR_BGR2RGB)))
+    return leaves
+
+
+def timed(backend, leaf, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        mask, percent = backend.mask_and_percent(leaf)
+    return mask, percent, (time.perf_counter() - start) / repeats
+
+
+def main():
+    # -----------------------------
+    # Parse args / defaults
+    # -----------------------------
+    path = sys.argv[1] if len(sys.argv) > 1 else "input_images"
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    model_path = "models/severity_model.onnx"
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Leaf images not found: {path}")
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Severity model not found: {model_path}")
+
+    leaves = load_leaves(path)
+    if not leaves:
+        raise RuntimeError("No leaf images to benchmark")
+
+    onnx = SeverityEstimator(model_path)
+    color = ColorSeverityEstimator(rgb=True)
+
+    # Warm up both backends (first ONNX run allocates buffers)
+    for backend in (onnx, color):
+        backend.mask_and_percent(leaves[0][1])
+
+    print(f"🏁 Benchmarking {len(leaves)} leaves x {repeats} runs")
+
+    diffs, ious, decision_matches = [], [], 0
+    onnx_times, color_times = [], []
+
+    for name, leaf in leaves:
+        onnx_mask, onnx_pct, onnx_t = timed(onnx, leaf, repeats)
+        color_mask, color_pct, color_t = timed(color, leaf, repeats)
+        onnx_times.append(onnx_t)
+        color_times.append(color_t)
+
+        # Compare masks at the ONNX output resolution
+        color_mask = cv2.resize(
+            color_mask.view(np.uint8),
+            (onnx_mask.shape[1], onnx_mask.shape[0]),
+            interpolation=cv2.INTER_NEAREST,
+        ).astype(bool)
+        union = np.count_nonzero(onnx_mask | color_mask)
+        iou = np.count_nonzero(onnx_mask & color_mask) / union if union else 1.0
+
+        diffs.append(abs(onnx_pct - color_pct))
+        ious.append(iou)
+        decision_matches += decide(onnx_pct) == decide(color_pct)
+
+        print(
+            f"🌿 {os.path.basename(name)} | onnx={onnx_pct:.2f}% "
+            f"({onnx_t * 1000:.1f} ms) | color={color_pct:.2f}% "
+            f"({color_t * 1000:.2f} ms) | IoU={iou:.2f}"
+        )
+
+    n = len(leaves)
+    onnx_ms = np.mean(onnx_times) * 1000
+    color_ms = np.mean(color_times) * 1000
+
+    print("\n📊 Summary")
+    print(f"   ONNX model:      {onnx_ms:.1f} ms/leaf")
+    print(f"   Color threshold: {color_ms:.2f} ms/leaf ({onnx_ms / max(color_ms, 1e-6):.0f}x faster)")
+    print(f"   Mean |Δ severity|: {np.mean(diffs):.2f} pp")
+    print(f"   Mean mask IoU:     {np.mean(ious):.2f}")
+    print(f"   Decision agreement: {decision_matches}/{n} ({decision_matches / n * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+# edge/conftest.py
+#
+# Lets pytest import the edge modules (decision.*, position.*, ...) the same
+# way the entry points do when run from this folder.
+
+# Hardware smoke scripts (need a webcam / RPi.GPIO), not pytest tests
+collect_ignore = ["camera/test_camera.py", "actuator/test_gpio.py"]
@@ -0,0 +1,174 @@
+import bisect
+import json
+import math
+import os
+import time
+from collections import defaultdict
+
+
+EARTH_RADIUS_M = 6371000.0
+
+
+class SprayCoverageMap:
+    """Spatial index of spray events (where and when the field was treated).
+
+    Positions (lat, lng) are projected to local meters around the first
+    recorded/queried point and hashed into square grid cells of
+    `cell_size_m`. Each cell keeps its event timestamps in chronological
+    order, so `treated_recently` only visits the few cells overlapping the
+    query radius and bisects their time lists: O(log n) per cell, no matter
+    how many events a season accumulates.
+
+    Events older than `ttl_sec` can never match again, so they are dropped:
+    a cell's expired events are pruned whenever a new event is inserted
+    into it, keeping memory bounded by the spray rate over one TTL.
+
+    If `log_path` is given, events are appended to it as JSON lines and
+    reloaded on startup, so coverage survives restarts. Expired (and
+    corrupt) lines are skipped on load and the log is rewritten without
+    them, so it does not grow forever either. `clock` can be replaced for
+    deterministic runs.
+    """
+
+    def __init__(self, cell_size_m=1.0, radius_m=0.75, ttl_sec=86400.0,
+                 log_path=None, clock=time.time):
+        self.cell_size = float(cell_size_m)
+        self.radius = float(radius_m)
+        self.ttl = float(ttl_sec)
+        self.log_path = log_path
+        self.clock = clock
+
+        self._origin = None
+        # cell -> ([timestamps], [(x, y)]) in chronological order
+        self._cells = defaultdict(lambda: ([], []))
+        self.count = 0
+
+        if log_path and os.path.exists(log_path):
+            self._load(log_path)
+
+    # ---- projection ----
+    def _to_xy(self, lat, lng):
+        if self._origin is None:
+            self._origin = (lat, lng, math.cos(math.radians(lat)))
+        lat0, lng0, cos_lat0 = self._origin
+        x = math.radians(lng - lng0) * cos_lat0 * EARTH_RADIUS_M
+        y = math.radians(lat - lat0) * EARTH_RADIUS_M
+        return x, y
+
+    def _cell(self, x, y):
+        return (
+            int(math.floor(x / self.cell_size)),
+            int(math.floor(y / self.cell_size)),
+        )
+
+    # ---- updates ----
+    def record(self, position, timestamp=None, amount=None):
+        """Record a spray at position (lat, lng)."""
+
+        if timestamp is None:
+            timestamp = self.clock()
+        lat, lng = position
+        self._insert(lat, lng, timestamp)
+
+        if self.log_path:
+            with open(self.log_path, "a") as f:
+                f.write(
+                    json.dumps(
+                        {"t": timestamp, "lat": lat, "lng": lng, "amount": amount}
+                    )
+                    + "\n"
+                )
+
+    def _insert(self, lat, lng, timestamp):
+        x, y = self._to_xy(lat, lng)
+        times, points = self._cells[self._cell(x, y)]
+
+        # Drop this cell's events that expired before the newest one
+        newest = max(timestamp, times[-1]) if times else timestamp
+        expired = bisect.bisect_left(times, newest - self.ttl)
+        if expired:
+            del times[:expired]
+            del points[:expired]
+            self.count -= expired
+        if timestamp < newest - self.ttl:
+            return
+
+        # Events normally arrive in time order; keep lists sorted otherwise
+        i = len(times)
+        if times and timestamp < times[-1]:
+            i = bisect.bisect_right(times, timestamp)
+        times.insert(i, timestamp)
+        points.insert(i, (x, y))
+        self.count += 1
+
+    def _load(self, path):
+        since = self.clock() - self.ttl
+        kept, dropped = [], 0
+
+        with open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                    lat, lng = float(event["lat"]), float(event["lng"])
+                    timestamp = float(event["t"])
+                except (ValueError, KeyError, TypeError):
+                    # Skip corrupt/foreign lines instead of failing startup
+                    dropped += 1
+                    continue
+                if timestamp < since:
+                    dropped += 1
+                    continue
+                self._insert(lat, lng, timestamp)
+                kept.append(line)
+
+        if dropped:
+            self._compact(path, kept)
+        print(
+            f"🗺 Loaded {self.count} spray events from {path} "
+            f"({dropped} expired/invalid dropped)"
+        )
+
+    @staticmethod
+    def _compact(path, lines):
+        """Rewrite the log with only `lines` (atomic rename)."""
+
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.writelines(line + "\n" for line in lines)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not compact spray log {path}: {e}")
+
+    # ---- queries ----
+    def treated_recently(self, position, now=None):
+        """True if a spray within `radius_m` happened in the last `ttl_sec`."""
+
+        if self.count == 0:
+            return False
+        if now is None:
+            now = self.clock()
+
+        lat, lng = position
+        x, y = self._to_xy(lat, lng)
+        since = now - self.ttl
+        r2 = self.radius * self.radius
+
+        cx0, cy0 = self._cell(x - self.radius, y - self.radius)
+        cx1, cy1 = self._cell(x + self.radius, y + self.radius)
+
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = self._cells.get((cx, cy))
+                if cell is None:
+                    continue
+                times, points = cell
+                # Index from the first unexpired event (no list slice copy)
+                for i in range(bisect.bisect_left(times, since), len(times)):
+                    px, py = points[i]
+                    if (px - x) ** 2 + (py - y) ** 2 <= r2:
+                        return True
+        return False
@@ -1,7 +1,11 @@
-def decide(plant_percent):
+def decide(plant_percent, position=None, coverage=None):
     """Binary spray decision based on plant infection percentage.
 
     plant_percent: average infection percentage (0–100) for the plant.
+    position: optional (lat, lng) of the plant / robot.
+    coverage: optional SprayCoverageMap; if the position was treated
+        recently, no spray is requested (the decision is marked with
+        "recently_treated": True).
 
     Current simple rule:
         - If infection == 0%       → NO SPRAY
@@ -17,6 +21,13 @@ def decide(plant_percent):
     if plant_percent <= 0.0:
         return {"spray": False, "amount": 0}
 
+    if (
+        coverage is not None
+        and position is not None
+        and coverage.treated_recently(position)
+    ):
+        return {"spray": False, "amount": 0, "recently_treated": True}
+
     return {"spray": True, "amount": 5}
 
     # --- Original multi-level policy (commented out) ---
@@ -0,0 +1,172 @@
+import json
+
+from decision.coverage_map import SprayCoverageMap
+from decision.decision_engine import decide
+from position.position_source import SimulatedPositionSource
+
+
+LAT, LNG = 37.7749, -122.4194
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def make_robot(clock, heading_deg=90.0, speed_mps=1.0):
+    # Heading 90° = driving east at 1 m/s, so position == meters from start
+    return SimulatedPositionSource(LAT, LNG, heading_deg, speed_mps, clock=clock)
+
+
+def test_treated_within_radius_only():
+    clock = FakeClock()
+    robot = make_robot(clock)
+    cov = SprayCoverageMap(cell_size_m=1.0, radius_m=0.75, ttl_sec=100.0)
+
+    cov.record(robot.read(), timestamp=clock())
+
+    clock.t += 0.5  # 0.5 m away
+    assert cov.treated_recently(robot.read(), now=clock())
+
+    clock.t += 0.5  # 1.0 m away
+    assert not cov.treated_recently(robot.read(), now=clock())
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    robot = make_robot(clock, speed_mps=0.0)
+    cov = SprayCoverageMap(cell_size_m=1.0, radius_m=0.75, ttl_sec=60.0)
+
+    cov.record(robot.read(), timestamp=clock())
+
+    assert cov.treated_recently(robot.read(), now=clock() + 59.0)
+    assert not cov.treated_recently(robot.read(), now=clock() + 61.0)
+
+
+def test_radius_larger_than_cell_spans_cells():
+    clock = FakeClock()
+    robot = make_robot(clock)
+    cov = SprayCoverageMap(cell_size_m=0.5, radius_m=2.0, ttl_sec=100.0)
+
+    cov.record(robot.read(), timestamp=clock())
+
+    # 1.8 m east is three to four cells away but still inside the radius
+    clock.t += 1.8
+    assert cov.treated_recently(robot.read(), now=clock())
+
+    clock.t += 0.4  # 2.2 m
+    assert not cov.treated_recently(robot.read(), now=clock())
+
+    # Same distance west (negative cell indices)
+    west_clock = FakeClock()
+    west = make_robot(west_clock, heading_deg=270.0)
+    west_clock.t += 1.8
+    assert cov.treated_recently(west.read(), now=clock())
+    west_clock.t += 0.4
+    assert not cov.treated_recently(west.read(), now=clock())
+
+
+def test_decide_skips_recently_treated():
+    clock = FakeClock()
+    robot = make_robot(clock)
+    cov = SprayCoverageMap(cell_size_m=1.0, radius_m=0.75, ttl_sec=100.0)
+
+    assert decide(10.0, position=robot.read(), coverage=cov)["spray"]
+
+    cov.record(robot.read())
+    decision = decide(10.0, position=robot.read(), coverage=cov)
+    assert not decision["spray"]
+    assert decision["recently_treated"]
+
+
+def test_log_round_trip(tmp_path):
+    log = tmp_path / "spray.jsonl"
+    clock = FakeClock()
+    robot = make_robot(clock)
+
+    cov = SprayCoverageMap(radius_m=0.75, ttl_sec=100.0, log_path=str(log))
+    cov.record(robot.read(), timestamp=clock(), amount=5)
+    clock.t += 10.0
+    cov.record(robot.read(), timestamp=clock(), amount=5)
+
+    reloaded = SprayCoverageMap(
+        radius_m=0.75, ttl_sec=100.0, log_path=str(log), clock=clock
+    )
+    assert reloaded.count == 2
+
+    clock.t = 1000.0
+    assert reloaded.treated_recently(robot.read(), now=1050.0)
+    clock.t = 1005.0  # 5 m from both sprays
+    assert not reloaded.treated_recently(robot.read(), now=1050.0)
+
+
+def test_log_skips_malformed_lines(tmp_path):
+    log = tmp_path / "spray.jsonl"
+    good = {"t": 1000.0, "lat": LAT, "lng": LNG, "amount": 5}
+    lines = [
+        json.dumps(good),
+        "not json",
+        json.dumps([1, 2, 3]),
+        json.dumps({"t": None, "lat": LAT, "lng": LNG}),
+        json.dumps({"lat": LAT}),
+        "",
+    ]
+    log.write_text("\n".join(lines) + "\n")
+
+    cov = SprayCoverageMap(
+        radius_m=0.75, ttl_sec=100.0, log_path=str(log), clock=FakeClock(1010.0)
+    )
+    assert cov.count == 1
+    assert cov.treated_recently((LAT, LNG), now=1010.0)
+
+    # Bad lines are compacted away
+    assert [json.loads(line) for line in log.read_text().splitlines()] == [good]
+
+
+def test_expired_events_pruned_on_insert():
+    clock = FakeClock()
+    robot = make_robot(clock, speed_mps=0.0)
+    cov = SprayCoverageMap(cell_size_m=1.0, radius_m=0.75, ttl_sec=60.0)
+
+    for _ in range(5):
+        cov.record(robot.read(), timestamp=clock())
+        clock.t += 30.0
+    # Each insert drops same-cell events more than 60 s older than it
+    assert cov.count == 3
+
+    # Out-of-order events that already expired are not stored
+    cov.record(robot.read(), timestamp=clock() - 500.0)
+    assert cov.count == 3
+
+    # A late event inside the TTL is kept in time order
+    cov.record(robot.read(), timestamp=clock() - 50.0)
+    assert cov.count == 4
+    times, _ = cov._cells[cov._cell(0.0, 0.0)]
+    assert times == sorted(times)
+
+
+def test_log_compacted_on_load(tmp_path):
+    log = tmp_path / "spray.jsonl"
+    clock = FakeClock()
+    robot = make_robot(clock)
+
+    cov = SprayCoverageMap(ttl_sec=100.0, log_path=str(log), clock=clock)
+    for _ in range(4):
+        cov.record(robot.read(), amount=5)
+        clock.t += 50.0
+
+    # Now 1200: only the sprays at 1100 and 1150 are within the TTL
+    reloaded = SprayCoverageMap(ttl_sec=100.0, log_path=str(log), clock=clock)
+    assert reloaded.count == 2
+
+    events = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [e["t"] for e in events] == [1100.0, 1150.0]
+    assert all(e["amount"] == 5 for e in events)
+
+    # Nothing expired: the log is left as is
+    before = log.read_text()
+    SprayCoverageMap(ttl_sec=100.0, log_path=str(log), clock=clock)
+    assert log.read_text() == before
@@ -0,0 +1,182 @@
+import cv2
+import numpy as np
+
+
+def blend_mask_inplace(image, mask, x1, y1, x2, y2, color=(0, 0, 255), alpha=0.4):
+    """Tint the pixels of `mask` inside the ROI (x1, y1, x2, y2) of `image`.
+
+    Equivalent to `addWeighted(leaf, 1 - alpha, overlay, alpha, 0)` where
+    `overlay` is the leaf painted with `color`, but only the masked pixels
+    of the ROI are touched (no full-crop copies or temporaries).
+
+    mask: 2D boolean/uint8 array at any resolution (e.g. the 224x224
+    segmentation output); it is resized to the ROI with nearest neighbour.
+    """
+
+    roi = image[y1:y2, x1:x2]
+    if roi.size == 0 or mask is None:
+        return image
+
+    mask = np.asarray(mask)
+    if mask.dtype == np.bool_:
+        mask = mask.view(np.uint8)
+    elif mask.dtype != np.uint8:
+        mask = (mask > 0).view(np.uint8)
+
+    h, w = roi.shape[:2]
+    if mask.shape[:2] != (h, w):
+        mask = cv2.resize(mask, (w, h), interpolation=cv2.INTER_NEAREST)
+
+    sel = mask > 0
+    if not sel.any():
+        return image
+
+    pixels = roi[sel].astype(np.float32)
+    pixels *= 1.0 - alpha
+    pixels += np.asarray(color, dtype=np.float32) * alpha
+    roi[sel] = np.clip(pixels + 0.5, 0, 255).astype(np.uint8)
+    return image
+
+
+class AnnotationRenderer:
+    """Caches the annotated frame and redraws it only when results change.
+
+    The display loop runs much faster than inference, so instead of copying
+    the frame and redrawing every box on each tick:
+
+        - `update(...)` (once per inference) copies the frame into a reused
+          buffer, blends segmentation masks inside their boxes and draws
+          boxes/labels.
+        - `render(status)` (every tick) returns the cached image, only
+          repainting the status band when the status text changed.
+        - `encode_jpeg(...)` encodes the current image for headless use
+          (dashboard snapshots, saving to disk) and caches the bytes until
+          the next change.
+    """
+
+    STATUS_ORIGIN = (10, 30)
+    STATUS_BAND_HEIGHT = 45
+
+    def __init__(
+        self,
+        box_color=(0, 255, 0),
+        mask_color=(0, 0, 255),
+        mask_alpha=0.4,
+        status_color=(255, 255, 255),
+    ):
+        self.box_color = box_color
+        self.mask_color = mask_color
+        self.mask_alpha = mask_alpha
+        self.status_color = status_color
+
+        self._image = None
+        self._status_band = None
+        self._status = None
+        self._jpeg = None
+        self._jpeg_key = None
+
+        # Bumped whenever the rendered image changes (useful as an ETag)
+        self.version = 0
+
+    @property
+    def image(self):
+        """Current annotated image (None until the first `update`)."""
+        return self._image
+
+    def update(self, frame, boxes, masks=None, labels=None, colors=None):
+        """Rebuild the annotated layer for a new inference result.
+
+        frame: BGR image the boxes refer to.
+        boxes: list of (cls, x1, y1, x2, y2, score).
+        masks: optional list (parallel to boxes) of per-leaf masks or None.
+        labels: optional list of label strings; defaults to the score.
+        colors: optional list of BGR box colors; defaults to `box_color`.
+        """
+
+        if self._image is None or self._image.shape != frame.shape:
+            self._image = frame.copy()
+        else:
+            np.copyto(self._image, frame)
+
+        image = self._image
+
+        for i, (cls, x1, y1, x2, y2, score) in enumerate(boxes):
+            if masks is not None and masks[i] is not None:
+                blend_mask_inplace(
+                    image,
+                    masks[i],
+                    x1,
+                    y1,
+                    x2,
+                    y2,
+                    color=self.mask_color,
+                    alpha=self.mask_alpha,
+                )
+
+            color = colors[i] if colors is not None else self.box_color
+            label = labels[i] if labels is not None else f"{score:.2f}"
+
+            cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+            cv2.putText(
+                image,
+                label,
+                (x1, max(0, y1 - 8)),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.5,
+                color,
+                1,
+                cv2.LINE_AA,
+            )
+
+        # Keep a pristine copy of the status band so the status line can be
+        # redrawn without touching (or copying) the rest of the frame.
+        self._status_band = image[: self.STATUS_BAND_HEIGHT].copy()
+        self._status = None
+        self.version += 1
+        return image
+
+    def render(self, status=None):
+        """Return the annotated image with `status` drawn at the top-left.
+
+        The returned array is the cached buffer itself; callers must not
+        modify it.
+        """
+
+        if self._image is None:
+            return None
+
+        if status != self._status:
+            band_height = self._status_band.shape[0]
+            self._image[:band_height] = self._status_band
+            if status:
+                cv2.putText(
+                    self._image,
+                    status,
+                    self.STATUS_ORIGIN,
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.7,
+                    self.status_color,
+                    2,
+                )
+            self._status = status
+            self.version += 1
+
+        return self._image
+
+    def encode_jpeg(self, quality=80):
+        """Encode the current image to JPEG bytes (None before `update`)."""
+
+        if self._image is None:
+            return None
+
+        key = (self.version, quality)
+        if self._jpeg_key != key:
+            ok, buf = cv2.imencode(
+                ".jpg", self._image, [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+            )
+            if not ok:
+                raise RuntimeError("❌ Failed to encode annotated frame")
+            self._jpeg = buf.tobytes()
+            self._jpeg_key = key
+
+        return self._jpeg
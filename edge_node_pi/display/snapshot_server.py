@@ -0,0 +1,315 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+
+class SnapshotEncoder:
+    """Encodes the latest submitted frame to JPEG in a background thread.
+
+    - `submit(frame)` only copies the frame into a reused buffer and wakes
+      the worker, so the caller (inference/display loop) never pays for
+      resizing or JPEG encoding.
+    - Frames are only encoded while someone is subscribed (an open MJPEG
+      stream, or a snapshot request within the last `idle_timeout` seconds);
+      the last frame is kept so a new subscriber gets it encoded right away.
+    - The resize target buffer is allocated once and reused between frames.
+      The encoded array from `cv2.imencode` is kept as is and exposed as a
+      read-only `memoryview`, so it is never copied into `bytes`. (The
+      Python binding always allocates the encode output; each new array
+      replaces the previous one, so views held by clients stay valid.)
+
+    OpenCV's JPEG encoder is backed by libjpeg-turbo (NEON on the Pi), which
+    is the fastest encoder generally available on the node.
+    """
+
+    def __init__(self, quality=75, scale=0.5, idle_timeout=5.0):
+        self.quality = int(quality)
+        self.scale = float(scale)
+        self.idle_timeout = float(idle_timeout)
+
+        self._cond = threading.Condition()
+        self._pending = None
+        self._pending_dirty = False
+        self._resized = None
+
+        self._jpeg = None
+        self._version = 0
+        # Distinguishes ETags across restarts (version restarts at 0)
+        self.epoch = int(time.time())
+
+        self._streams = 0
+        self._last_request = 0.0
+
+        self._running = False
+        self._thread = None
+
+    # ---- producer side ----
+    def submit(self, frame):
+        """Hand over a new BGR frame (copied; encoded later if watched)."""
+
+        if frame is None:
+            return
+
+        with self._cond:
+            if self._pending is None or self._pending.shape != frame.shape:
+                self._pending = frame.copy()
+            else:
+                np.copyto(self._pending, frame)
+
+            self._pending_dirty = True
+            self._cond.notify_all()
+
+    # ---- subscriber side ----
+    @property
+    def running(self):
+        return self._running
+
+    def latest(self, timeout=2.0):
+        """Return (version, jpeg memoryview) of the most recent snapshot.
+
+        If a newer frame is still waiting to be encoded (e.g. the first
+        request after an idle period), waits up to `timeout` seconds for it.
+        """
+
+        with self._cond:
+            self._touch()
+            if self._pending_dirty and self._running:
+                version = self._version
+                self._cond.wait_for(
+                    lambda: self._version > version or not self._running,
+                    timeout=timeout,
+                )
+            return self._version, self._jpeg
+
+    def wait_for_newer(self, version, timeout=None):
+        """Block until a snapshot newer than `version` exists (or timeout)."""
+
+        with self._cond:
+            self._touch()
+            self._cond.wait_for(
+                lambda: self._version > version or not self._running,
+                timeout=timeout,
+            )
+            return self._version, self._jpeg
+
+    def open_stream(self):
+        with self._cond:
+            self._streams += 1
+            self._cond.notify_all()
+
+    def close_stream(self):
+        with self._cond:
+            self._streams = max(0, self._streams - 1)
+
+    def _touch(self):
+        self._last_request = time.time()
+        # Wake the worker in case a frame is waiting for a subscriber
+        self._cond.notify_all()
+
+    def _has_subscribers(self):
+        if self._streams > 0:
+            return True
+        return time.time() - self._last_request < self.idle_timeout
+
+    # ---- worker ----
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="snapshot-encoder", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: (self._pending_dirty and self._has_subscribers())
+                    or not self._running
+                )
+                if not self._running:
+                    return
+                frame = self._prepare(self._pending)
+                self._pending_dirty = False
+
+            ok, buf = cv2.imencode(
+                ".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+            )
+            if not ok:
+                continue
+
+            with self._cond:
+                self._jpeg = memoryview(buf.reshape(-1)).toreadonly()
+                self._version += 1
+                self._cond.notify_all()
+
+    def _prepare(self, frame):
+        """Downscale (or copy) the pending frame into the reused buffer.
+
+        Runs under the lock so `submit` cannot overwrite the frame mid-read;
+        the encode itself happens after the lock is released.
+        """
+
+        if self.scale >= 1.0:
+            if self._resized is None or self._resized.shape != frame.shape:
+                self._resized = frame.copy()
+            else:
+                np.copyto(self._resized, frame)
+            return self._resized
+
+        h, w = frame.shape[:2]
+        size = (max(1, int(w * self.scale)), max(1, int(h * self.scale)))
+        if self._resized is None or self._resized.shape[1::-1] != size:
+            self._resized = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        else:
+            cv2.resize(
+                frame, size, dst=self._resized, interpolation=cv2.INTER_AREA
+            )
+        return self._resized
+
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header value matches `etag`.
+
+    Handles `*`, comma-separated lists and weak `W/"..."` tags (If-None-Match
+    uses weak comparison, RFC 9110 §13.1.2).
+    """
+
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class _SnapshotHandler(BaseHTTPRequestHandler):
+    encoder = None
+    stream_fps = 10.0
+    BOUNDARY = "frame"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/snapshot.jpg":
+            self._serve_snapshot()
+        elif path == "/stream.mjpg":
+            self._serve_stream()
+        else:
+            self.send_error(404)
+
+    def _serve_snapshot(self):
+        version, jpeg = self.encoder.latest()
+        if jpeg is None:
+            self.send_error(503, "No snapshot available yet")
+            return
+
+        etag = f'"{self.encoder.epoch}-{version}"'
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(jpeg.nbytes))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(jpeg)
+
+    def _serve_stream(self):
+        self.send_response(200)
+        self.send_header(
+            "Content-Type", f"multipart/x-mixed-replace; boundary={self.BOUNDARY}"
+        )
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        min_interval = 1.0 / self.stream_fps if self.stream_fps > 0 else 0.0
+        version = 0
+
+        self.encoder.open_stream()
+        try:
+            while self.encoder.running:
+                latest, jpeg = self.encoder.wait_for_newer(version, timeout=5.0)
+                if jpeg is None or latest == version:
+                    continue
+                version = latest
+
+                self.wfile.write(
+                    (
+                        f"--{self.BOUNDARY}\r\n"
+                        "Content-Type: image/jpeg\r\n"
+                        f"Content-Length: {jpeg.nbytes}\r\n\r\n"
+                    ).encode("ascii")
+                )
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+                time.sleep(min_interval)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.encoder.close_stream()
+
+    def log_message(self, format, *args):
+        # Keep the console for pipeline logs
+        pass
+
+
+class SnapshotServer:
+    """Serves the latest snapshot over HTTP.
+
+    Endpoints:
+        GET /snapshot.jpg  latest JPEG (ETag / If-None-Match → 304)
+        GET /stream.mjpg   multipart MJPEG stream
+    """
+
+    def __init__(self, host="0.0.0.0", port=8080, quality=75, scale=0.5,
+                 stream_fps=10.0):
+        self.encoder = SnapshotEncoder(quality=quality, scale=scale)
+
+        handler = type(
+            "SnapshotHandler",
+            (_SnapshotHandler,),
+            {"encoder": self.encoder, "stream_fps": float(stream_fps)},
+        )
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    def start(self):
+        self.encoder.start()
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="snapshot-http", daemon=True
+        )
+        self._thread.start()
+        host, port = self.httpd.server_address[:2]
+        print(f"🌐 Snapshot server on http://{host}:{port}/snapshot.jpg")
+
+    def submit(self, frame):
+        self.encoder.submit(frame)
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.encoder.stop()
+        print("🌐 Snapshot server stopped")
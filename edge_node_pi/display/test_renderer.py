@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+
+from display.renderer import AnnotationRenderer, blend_mask_inplace
+
+
+def _old_overlay(image, mask, x1, y1, x2, y2):
+    """Previous visualize_image.py path: full crop copy + addWeighted."""
+
+    out = image.copy()
+    leaf = out[y1:y2, x1:x2]
+    mask_resized = cv2.resize(
+        mask.astype("uint8") * 255,
+        (leaf.shape[1], leaf.shape[0]),
+        interpolation=cv2.INTER_NEAREST,
+    )
+    overlay = leaf.copy()
+    overlay[mask_resized > 0] = (0, 0, 255)
+    out[y1:y2, x1:x2] = cv2.addWeighted(leaf, 0.6, overlay, 0.4, 0)
+    return out
+
+
+def test_blend_mask_matches_add_weighted():
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    mask = rng.random((224, 224)) > 0.5
+    x1, y1, x2, y2 = 20, 10, 130, 90
+
+    expected = _old_overlay(image, mask, x1, y1, x2, y2)
+    got = image.copy()
+    blend_mask_inplace(got, mask, x1, y1, x2, y2, color=(0, 0, 255), alpha=0.4)
+
+    np.testing.assert_array_equal(got, expected)
+
+
+def test_blend_mask_leaves_pixels_outside_mask_untouched():
+    image = np.full((50, 50, 3), 100, dtype=np.uint8)
+    mask = np.zeros((10, 10), dtype=bool)
+
+    blend_mask_inplace(image, mask, 5, 5, 45, 45)
+
+    assert (image == 100).all()
+
+
+def test_render_only_repaints_status_band():
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    renderer = AnnotationRenderer()
+    renderer.update(frame, [(1, 40, 60, 100, 110, 0.9)])
+    below_band = renderer.image[AnnotationRenderer.STATUS_BAND_HEIGHT:].copy()
+
+    first = renderer.render("Infection: 1.0%")
+    version = renderer.version
+    again = renderer.render("Infection: 1.0%")
+
+    assert again is first  # cached buffer, no copy per tick
+    assert renderer.version == version
+    np.testing.assert_array_equal(
+        renderer.image[AnnotationRenderer.STATUS_BAND_HEIGHT:], below_band
+    )
+
+    renderer.render("Infection: 2.0%")
+    assert renderer.version == version + 1
@@ -0,0 +1,51 @@
+import http.client
+
+import numpy as np
+
+from display.snapshot_server import SnapshotServer, etag_matches
+
+
+def test_etag_matches_header_forms():
+    etag = '"17-3"'
+    assert etag_matches('"17-3"', etag)
+    assert etag_matches('W/"17-3"', etag)
+    assert etag_matches('"1-1", W/"17-3" ,"9-9"', etag)
+    assert etag_matches("*", etag)
+    assert etag_matches(" * ", etag)
+
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
+    assert not etag_matches('"17-4"', etag)
+    assert not etag_matches('"1-1", "17-30"', etag)
+
+
+def _get(port, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", "/snapshot.jpg", headers=headers or {})
+    resp = conn.getresponse()
+    body = resp.read()
+    conn.close()
+    return resp, body
+
+
+def test_snapshot_etag_round_trip():
+    server = SnapshotServer(host="127.0.0.1", port=0, scale=0.5)
+    server.start()
+    try:
+        port = server.httpd.server_address[1]
+        server.encoder.latest()  # subscribe before the frame arrives
+        server.submit(np.zeros((48, 64, 3), dtype=np.uint8))
+
+        resp, body = _get(port)
+        assert resp.status == 200
+        assert body[:2] == b"\xff\xd8"  # JPEG SOI marker
+        etag = resp.getheader("ETag")
+
+        resp, body = _get(port, {"If-None-Match": f'"x", W/{etag}'})
+        assert resp.status == 304
+        assert body == b""
+
+        resp, _ = _get(port, {"If-None-Match": '"stale"'})
+        assert resp.status == 200
+    finally:
+        server.stop()
@@ -0,0 +1,66 @@
+import cv2
+import numpy as np
+
+from inference.severity_backend import SeverityBackend
+
+
+class ColorSeverityEstimator(SeverityBackend):
+    """Classical color-threshold lesion estimator (no model required).
+
+    Marks lesion pixels on a downsampled crop as:
+        - brown/yellow hue (HSV) with enough saturation, or
+        - red-shifted Lab a* (healthy leaf tissue is green, a* < 128)
+    restricted to pixels that are not too dark. Everything is a handful of
+    vectorized OpenCV/NumPy ops, so it runs in well under a millisecond per
+    crop and serves as the degraded-mode backend.
+
+    Returns the same (mask, percent) contract as `SeverityEstimator`, with
+    the percentage taken over the whole crop.
+    """
+
+    name = "color-threshold"
+
+    def __init__(
+        self,
+        rgb=True,
+        size=112,
+        hue_range=(8, 30),
+        min_saturation=60,
+        min_value=40,
+        min_a=135,
+    ):
+        # Crops in main_camera.py are converted to RGB before severity
+        self.to_hsv = cv2.COLOR_RGB2HSV if rgb else cv2.COLOR_BGR2HSV
+        self.to_lab = cv2.COLOR_RGB2LAB if rgb else cv2.COLOR_BGR2LAB
+        self.size = int(size)
+        self.hue_range = hue_range
+        self.min_saturation = min_saturation
+        self.min_value = min_value
+        self.min_a = min_a
+
+    def mask_and_percent(self, leaf, threshold=0.5):
+        """Return boolean lesion mask and infected area percentage.
+
+        `threshold` is accepted for interface compatibility and ignored.
+        """
+
+        small = cv2.resize(
+            leaf, (self.size, self.size), interpolation=cv2.INTER_AREA
+        )
+
+        hsv = cv2.cvtColor(small, self.to_hsv)
+        lab = cv2.cvtColor(small, self.to_lab)
+        h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+        a = lab[..., 1]
+
+        brown = (h >= self.hue_range[0]) & (h <= self.hue_range[1]) & (
+            s >= self.min_saturation
+        )
+        mask = (brown | (a >= self.min_a)) & (v >= self.min_value)
+
+        total_pixels = int(mask.size)
+        if total_pixels == 0:
+            return mask, 0.0
+
+        percent = np.count_nonzero(mask) / total_pixels * 100.0
+        return mask, float(percent)
@@ -0,0 +1,147 @@
+import cv2
+import numpy as np
+
+
+class LeafQualityGate:
+    """Cheap quality check for leaf crops before severity inference.
+
+    All metrics are computed on a small downsampled copy of the crop
+    (`sample_size` px on the long side), so the gate costs a fraction of
+    the blur + color conversion + ONNX segmentation it can skip:
+
+        - sharpness: variance of the Laplacian of the gray crop (blur)
+        - clipped:   fraction of pixels under/over-exposed, from the gray
+                     histogram
+        - leaf:      fraction of leaf-tissue pixels: saturated, not too dark,
+                     with a hue anywhere from lesion brown/yellow to green
+                     (`leaf_hue_range`, OpenCV 0-180 hue). Lesions count as
+                     leaf, so heavily infected leaves are not mistaken for
+                     background; washed-out soil, sky and shadow are not.
+        - green:     fraction of those pixels with a green hue
+                     (`green_hue_range`). Soil has the same brown hue as
+                     lesions, so a crop also needs a little remaining green
+                     tissue (`min_green_ratio`, much lower than the leaf
+                     ratio so mostly-lesion leaves still pass).
+
+    `check(leaf)` returns (accepted, weight, reason). Rejected crops should
+    not be sent to the severity model; accepted crops get a weight in
+    (0, 1] (1.0 if `weighting` is off) that is lower for blurry or poorly
+    exposed crops close to the reject thresholds, so they count less in the
+    plant average. The leaf/green ratios only gate; they never lower the weight,
+    since it says nothing about how reliable the severity of a real leaf is.
+    """
+
+    def __init__(
+        self,
+        sample_size=64,
+        min_sharpness=30.0,
+        max_clipped_fraction=0.4,
+        min_leaf_ratio=0.15,
+        min_green_ratio=0.03,
+        dark_level=10,
+        bright_level=245,
+        leaf_hue_range=(5, 90),
+        green_hue_range=(35, 90),
+        min_leaf_saturation=50,
+        min_leaf_value=30,
+        weighting=True,
+    ):
+        self.sample_size = int(sample_size)
+        self.min_sharpness = float(min_sharpness)
+        self.max_clipped_fraction = float(max_clipped_fraction)
+        self.min_leaf_ratio = float(min_leaf_ratio)
+        self.min_green_ratio = float(min_green_ratio)
+        self.dark_level = int(dark_level)
+        self.bright_level = int(bright_level)
+        self.leaf_hue_range = leaf_hue_range
+        self.green_hue_range = green_hue_range
+        self.min_leaf_saturation = int(min_leaf_saturation)
+        self.min_leaf_value = int(min_leaf_value)
+        self.weighting = bool(weighting)
+
+        self.counters = {
+            "accepted": 0,
+            "blurry": 0,
+            "exposure": 0,
+            "background": 0,
+        }
+
+    def _downsample(self, leaf):
+        h, w = leaf.shape[:2]
+        scale = self.sample_size / float(max(h, w))
+        if scale >= 1.0:
+            return leaf
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        return cv2.resize(leaf, size, interpolation=cv2.INTER_AREA)
+
+    def score(self, leaf):
+        """Return (sharpness, clipped, leaf_ratio, green_ratio) for a BGR crop."""
+
+        small = self._downsample(leaf)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        n = float(gray.size)
+
+        _, std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_32F))
+        sharpness = float(std[0, 0]) ** 2
+
+        hist = np.bincount(gray.ravel(), minlength=256)
+        clipped = (
+            hist[: self.dark_level + 1].sum() + hist[self.bright_level:].sum()
+        ) / n
+
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        s, v = self.min_leaf_saturation, self.min_leaf_value
+        lo, hi = self.leaf_hue_range
+        leaf_ratio = cv2.countNonZero(cv2.inRange(hsv, (lo, s, v), (hi, 255, 255))) / n
+        lo, hi = self.green_hue_range
+        green_ratio = cv2.countNonZero(cv2.inRange(hsv, (lo, s, v), (hi, 255, 255))) / n
+
+        return sharpness, float(clipped), float(leaf_ratio), float(green_ratio)
+
+    def check(self, leaf):
+        """Return (accepted, weight, reason) for a BGR leaf crop."""
+
+        sharpness, clipped, leaf_ratio, green_ratio = self.score(leaf)
+
+        if sharpness < self.min_sharpness:
+            reason = "blurry"
+        elif clipped > self.max_clipped_fraction:
+            reason = "exposure"
+        elif leaf_ratio < self.min_leaf_ratio or green_ratio < self.min_green_ratio:
+            reason = "background"
+        else:
+            reason = None
+
+        if reason is not None:
+            self.counters[reason] += 1
+            return False, 0.0, reason
+
+        self.counters["accepted"] += 1
+
+        if not self.weighting:
+            return True, 1.0, None
+
+        # Per metric: 0.5 at the reject threshold, rising linearly to 1.0 at
+        # twice the threshold (half the allowed clipped fraction)
+        w_sharp = (
+            min(1.0, sharpness / (2.0 * self.min_sharpness))
+            if self.min_sharpness > 0
+            else 1.0
+        )
+        w_expo = (
+            min(1.0, 1.5 - clipped / self.max_clipped_fraction)
+            if self.max_clipped_fraction > 0
+            else 1.0
+        )
+        weight = max(w_sharp * w_expo, 1e-3)
+        return True, weight, None
+
+    def summary(self):
+        total = sum(self.counters.values())
+        rejected = total - self.counters["accepted"]
+        return (
+            f"{rejected}/{total} rejected "
+            f"(blurry={self.counters['blurry']}, "
+            f"exposure={self.counters['exposure']}, "
+            f"background={self.counters['background']})"
+        )
@@ -0,0 +1,474 @@
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from decision.decision_engine import decide
+
+
+class ModelRegistry:
+    """Watches the models directory and hot-swaps models without a restart.
+
+    - A background thread polls the mtime of the detector and severity model
+      files. Once a changed file has been stable for one poll (so half-copied
+      files are not loaded), the new version is loaded in that thread.
+    - The candidate is validated on the last few cached frames/leaf crops
+      against the live models' outputs on those frames (see `observe`):
+      detectors must find most of the live boxes with the same classes,
+      severity models must stay within `max_severity_diff` of the live
+      percentages on average. Failing candidates are logged and discarded.
+    - Validated models are staged and only swapped in by `swap_pending()`,
+      which the main loop calls between frames, so a frame is never processed
+      by a half-replaced pipeline.
+
+    In "shadow" mode, a candidate severity model is dropped into a separate
+    file (`shadow_candidate_file`), so the live file on disk is never the
+    unpromoted model and a restart keeps the live one. The candidate is
+    built with `shadow_factory` (a single-threaded session, so it does not
+    take cores from the live model) and runs on a sampled fraction of frames
+    in its own thread; the difference in severity / decision against the
+    live model is logged. Shadow work is capped at `shadow_cpu_budget` of
+    wall time over a sliding `shadow_budget_window`: frames are not queued
+    and a running frame is abandoned once the cap is reached.
+
+    Creating the marker file `PROMOTE_SHADOW` in the models directory
+    promotes the shadowed model without a restart: the candidate file (only
+    if unchanged since it was shadowed) is loaded with the live factory,
+    validated, renamed over the live file and swapped in between frames.
+    Detector updates are always promoted after validation.
+
+    With `severity_optional=True` a missing/broken severity model at startup
+    leaves `severity` as None (callers fall back to another backend) and the
+    model is picked up as soon as a valid file appears.
+    """
+
+    def __init__(
+        self,
+        models_dir,
+        detector_file,
+        severity_file,
+        detector_factory,
+        severity_factory,
+        watch=True,
+        poll_interval=2.0,
+        validation_frames=3,
+        mode="promote",
+        shadow_fraction=0.2,
+        shadow_cpu_budget=0.25,
+        severity_optional=False,
+        shadow_factory=None,
+        shadow_budget_window=30.0,
+        shadow_candidate_file="severity_candidate.onnx",
+        min_box_recall=0.5,
+        min_class_agreement=0.5,
+        max_severity_diff=25.0,
+    ):
+        if mode not in ("promote", "shadow"):
+            raise ValueError(f"Unknown model registry mode: {mode}")
+
+        self.models_dir = models_dir
+        self.poll_interval = float(poll_interval)
+        self.mode = mode
+        self.shadow_fraction = float(shadow_fraction)
+        self.shadow_cpu_budget = float(shadow_cpu_budget)
+        self.shadow_budget_window = float(shadow_budget_window)
+        self.min_box_recall = float(min_box_recall)
+        self.min_class_agreement = float(min_class_agreement)
+        self.max_severity_diff = float(max_severity_diff)
+
+        self._paths = {
+            "detector": os.path.join(models_dir, detector_file),
+            "severity": os.path.join(models_dir, severity_file),
+        }
+        if mode == "shadow":
+            self._paths["shadow"] = os.path.join(models_dir, shadow_candidate_file)
+        self._factories = {
+            "detector": detector_factory,
+            "severity": severity_factory,
+            "shadow": shadow_factory or severity_factory,
+        }
+        self._promote_marker = os.path.join(models_dir, "PROMOTE_SHADOW")
+
+        # Live models are loaded synchronously so startup errors surface early
+        self.detector = detector_factory(self._paths["detector"])
+        try:
+            self.severity = severity_factory(self._paths["severity"])
+        except Exception as e:
+            if not severity_optional:
+                raise
+            print(f"⚠️ Severity model unavailable ({e}), waiting for a valid file")
+            self.severity = None
+        self.shadow = None
+        # mtime of the candidate file the running shadow was loaded from
+        self._shadow_source_mtime = None
+
+        self._lock = threading.Lock()
+        self._staged = {}
+        self._mtimes = {k: self._mtime(p) for k, p in self._paths.items()}
+        if "shadow" in self._mtimes:
+            # A candidate left over from a previous run is shadowed again
+            self._mtimes["shadow"] = None
+        self._seen = dict(self._mtimes)
+
+        # (frame, leaves, live boxes, live percents) for validating candidates
+        self._samples = deque(maxlen=validation_frames)
+
+        self._shadow_queue = queue.Queue(maxsize=1)
+        # (start, end) of shadow runs inside the budget window; end is None
+        # while a run is in progress
+        self._shadow_runs = deque()
+        self._budget_lock = threading.Lock()
+        self._reset_shadow_stats()
+
+        self._running = False
+        self._threads = []
+        self._watch = watch
+
+    # =============================
+    # LIFECYCLE
+    # =============================
+    def start(self):
+        self._running = True
+        targets = [self._shadow_loop]
+        if self._watch:
+            targets.append(self._watch_loop)
+        for target in targets:
+            t = threading.Thread(target=target, daemon=True)
+            t.start()
+            self._threads.append(t)
+        print(f"🗂 Model registry watching {self.models_dir} (mode={self.mode})")
+
+    def stop(self):
+        self._running = False
+        for t in self._threads:
+            t.join(timeout=2.0)
+        self._threads = []
+
+    # =============================
+    # MAIN LOOP HOOKS
+    # =============================
+    def swap_pending(self):
+        """Swap in validated models. Call between frames only."""
+
+        if not self._staged:
+            return False
+
+        with self._lock:
+            staged, self._staged = self._staged, {}
+
+        for kind, (model, mtime) in staged.items():
+            if kind == "shadow":
+                self.shadow = model
+                self._shadow_source_mtime = mtime
+                self._reset_shadow_stats()
+                print("🗂 New severity model running in SHADOW mode")
+            elif kind == "promote":
+                self.severity, self.shadow = model, None
+                self._shadow_source_mtime = None
+                print("🗂 Shadow severity model promoted to live")
+            else:
+                setattr(self, kind, model)
+                print(f"🗂 Swapped in new {kind} model")
+        return True
+
+    def observe(self, frame, leaves, boxes=None, percents=None):
+        """Cache a processed frame with the live models' outputs.
+
+        frame: the captured frame; leaves: preprocessed leaf crops.
+        boxes: live detector output on `frame` (before any filtering).
+        percents: live severity per leaf (None if not from the live model,
+            e.g. in degraded mode).
+
+        Used as validation input for new candidates.
+        """
+
+        self._samples.append(
+            (
+                frame,
+                list(leaves),
+                None if boxes is None else list(boxes),
+                None if percents is None else list(percents),
+            )
+        )
+
+    def submit_shadow(self, leaves, live_percents):
+        """Offer a frame's leaves to the shadow model (non-blocking).
+
+        The frame is dropped if it is not sampled, the shadow worker is still
+        busy, or shadow work already used its CPU budget.
+        """
+
+        if self.shadow is None or not leaves:
+            return
+        if random.random() >= self.shadow_fraction:
+            return
+
+        if self._shadow_load() >= self.shadow_cpu_budget:
+            self.shadow_stats["skipped_budget"] += 1
+            return
+
+        try:
+            self._shadow_queue.put_nowait((list(leaves), list(live_percents)))
+        except queue.Full:
+            pass
+
+    # =============================
+    # SHADOW CPU BUDGET
+    # =============================
+    def _reset_shadow_stats(self):
+        with self._budget_lock:
+            self._shadow_runs.clear()
+        self.shadow_stats = {
+            "frames": 0,
+            "skipped_budget": 0,
+            "mean_abs_diff": 0.0,
+            "decision_mismatches": 0,
+        }
+
+    def _shadow_load(self, now=None):
+        """Fraction of the last `shadow_budget_window` seconds spent in shadow runs."""
+
+        if now is None:
+            now = time.time()
+        window_start = now - self.shadow_budget_window
+
+        with self._budget_lock:
+            runs = self._shadow_runs
+            while runs and runs[0][1] is not None and runs[0][1] <= window_start:
+                runs.popleft()
+            busy = sum(
+                (now if end is None else end) - max(start, window_start)
+                for start, end in runs
+            )
+        return busy / self.shadow_budget_window
+
+    def _begin_shadow_run(self):
+        with self._budget_lock:
+            self._shadow_runs.append([time.time(), None])
+
+    def _end_shadow_run(self):
+        with self._budget_lock:
+            if self._shadow_runs and self._shadow_runs[-1][1] is None:
+                self._shadow_runs[-1][1] = time.time()
+
+    # =============================
+    # BACKGROUND WORK
+    # =============================
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _watch_loop(self):
+        while self._running:
+            time.sleep(self.poll_interval)
+
+            if os.path.exists(self._promote_marker):
+                self._load_promotion()
+
+            for kind, path in self._paths.items():
+                mtime = self._mtime(path)
+                if mtime is None or mtime == self._mtimes[kind]:
+                    self._seen[kind] = mtime
+                    continue
+
+                # Wait for the file to stop changing before loading it
+                if mtime != self._seen[kind]:
+                    self._seen[kind] = mtime
+                    continue
+
+                self._mtimes[kind] = mtime
+                self._load_candidate(kind, path, mtime)
+
+    def _load_candidate(self, kind, path, mtime=None):
+        print(f"🗂 Detected new {kind} model: {path}")
+
+        try:
+            model = self._factories[kind](path)
+            self._validate(kind, model)
+        except Exception as e:
+            print(f"❌ Rejected new {kind} model: {e}")
+            return False
+
+        with self._lock:
+            self._staged[kind] = (model, mtime)
+        print(f"✅ New {kind} model validated, swapping between frames")
+        return True
+
+    def _load_promotion(self):
+        """Handle the PROMOTE_SHADOW marker file."""
+
+        try:
+            os.remove(self._promote_marker)
+        except OSError:
+            pass
+
+        if self.shadow is None:
+            print("⚠️ PROMOTE_SHADOW ignored: no shadow model running")
+            return False
+
+        candidate = self._paths["shadow"]
+        mtime = self._mtime(candidate)
+        if mtime is None or mtime != self._shadow_source_mtime:
+            print("❌ PROMOTE_SHADOW ignored: candidate changed since it was shadowed")
+            return False
+
+        # Load the shadowed file with the live factory (full thread pool),
+        # then move it over the live file so restarts keep the promotion.
+        print("🗂 Promoting shadow severity model")
+        try:
+            model = self._factories["severity"](candidate)
+            self._validate("severity", model)
+            os.replace(candidate, self._paths["severity"])
+        except Exception as e:
+            print(f"❌ Shadow promotion failed: {e}")
+            return False
+
+        # The rename keeps the candidate's mtime; do not reload it as a new
+        # live model, and forget the (now missing) candidate file.
+        self._mtimes["severity"] = self._seen["severity"] = mtime
+        self._mtimes["shadow"] = self._seen["shadow"] = None
+
+        with self._lock:
+            self._staged["promote"] = (model, mtime)
+        return True
+
+    def _validate(self, kind, model):
+        samples = list(self._samples)
+        if not samples:
+            print(f"⚠️ No cached frames yet, {kind} model loaded without validation")
+            return
+
+        if kind == "detector":
+            self._validate_detector(model, samples)
+        else:
+            self._validate_severity(model, samples)
+
+    @staticmethod
+    def _iou(a, b):
+        ix = min(a[3], b[3]) - max(a[1], b[1])
+        iy = min(a[4], b[4]) - max(a[2], b[2])
+        if ix <= 0 or iy <= 0:
+            return 0.0
+        inter = ix * iy
+        area_a = (a[3] - a[1]) * (a[4] - a[2])
+        area_b = (b[3] - b[1]) * (b[4] - b[2])
+        return inter / float(area_a + area_b - inter)
+
+    def _validate_detector(self, model, samples):
+        """Reject detectors that grossly disagree with the live one.
+
+        Each live box is matched to the candidate box with the highest IoU
+        (>= 0.5). Too few matches means the candidate finds different
+        objects; matched boxes with different class IDs mean a different
+        class map (e.g. it never emits the infected class).
+        """
+
+        live_total = matched = same_class = 0
+
+        for frame, _, live_boxes, _ in samples:
+            boxes = model.detect(frame)
+            if not isinstance(boxes, list):
+                raise RuntimeError("detect() did not return a list")
+            if live_boxes is None:
+                continue
+
+            for live in live_boxes:
+                live_total += 1
+                best = max(boxes, key=lambda b: self._iou(live, b), default=None)
+                if best is None or self._iou(live, best) < 0.5:
+                    continue
+                matched += 1
+                same_class += best[0] == live[0]
+
+        if live_total == 0:
+            return
+
+        recall = matched / live_total
+        if recall < self.min_box_recall:
+            raise RuntimeError(
+                f"finds only {matched}/{live_total} live boxes (recall {recall:.2f})"
+            )
+        agreement = same_class / matched
+        if agreement < self.min_class_agreement:
+            raise RuntimeError(
+                f"class IDs agree on only {same_class}/{matched} matched boxes"
+            )
+
+    def _validate_severity(self, model, samples):
+        """Reject severity models far off the live percentages."""
+
+        diffs = []
+        for _, leaves, _, live_percents in samples:
+            for i, leaf in enumerate(leaves):
+                _, percent = model.mask_and_percent(leaf)
+                if not np.isfinite(percent) or not 0.0 <= percent <= 100.0:
+                    raise RuntimeError(f"invalid severity output: {percent}")
+                if live_percents is not None and i < len(live_percents):
+                    diffs.append(abs(percent - live_percents[i]))
+
+        if diffs:
+            mean_diff = sum(diffs) / len(diffs)
+            if mean_diff > self.max_severity_diff:
+                raise RuntimeError(
+                    f"severity differs from live model by {mean_diff:.1f} pp on average"
+                )
+
+    def _shadow_loop(self):
+        while self._running:
+            try:
+                leaves, live_percents = self._shadow_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            shadow = self.shadow
+            if shadow is None:
+                continue
+
+            shadow_percents = []
+            self._begin_shadow_run()
+            try:
+                for leaf in leaves:
+                    # Re-check the cap during the run, not only when queued
+                    if self._shadow_load() >= self.shadow_cpu_budget:
+                        self.shadow_stats["skipped_budget"] += 1
+                        break
+                    shadow_percents.append(shadow.estimate(leaf))
+            except Exception as e:
+                print(f"❌ Shadow model failed: {e}")
+                continue
+            finally:
+                self._end_shadow_run()
+
+            if len(shadow_percents) < len(leaves) or shadow is not self.shadow:
+                continue
+
+            self._record_shadow(live_percents, shadow_percents)
+
+    def _record_shadow(self, live_percents, shadow_percents):
+        live_plant = sum(live_percents) / len(live_percents)
+        shadow_plant = sum(shadow_percents) / len(shadow_percents)
+        diff = abs(live_plant - shadow_plant)
+
+        stats = self.shadow_stats
+        stats["frames"] += 1
+        stats["mean_abs_diff"] += (diff - stats["mean_abs_diff"]) / stats["frames"]
+
+        live_decision = decide(live_plant)
+        shadow_decision = decide(shadow_plant)
+        mismatch = live_decision != shadow_decision
+        if mismatch:
+            stats["decision_mismatches"] += 1
+
+        print(
+            f"👥 Shadow: live={live_plant:.2f}% shadow={shadow_plant:.2f}% "
+            f"|diff|={diff:.2f} (mean {stats['mean_abs_diff']:.2f}) "
+            f"decision {'MISMATCH' if mismatch else 'match'} "
+            f"({stats['decision_mismatches']}/{stats['frames']})"
+        )
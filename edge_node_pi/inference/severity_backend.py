@@ -0,0 +1,91 @@
+import time
+from abc import ABC, abstractmethod
+
+
+class SeverityBackend(ABC):
+    """Common interface for severity estimators.
+
+    Backends implement `mask_and_percent(leaf, threshold=0.5)` returning
+    (2D boolean mask, infected area percentage 0–100) for a cropped leaf,
+    so they can be swapped without touching the pipeline.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def mask_and_percent(self, leaf, threshold=0.5):
+        """Return (mask, infected percentage) for a cropped leaf."""
+
+    def estimate(self, leaf):
+        """Estimate infected area percentage for a cropped leaf image."""
+
+        _, percent = self.mask_and_percent(leaf)
+        return percent
+
+
+class DegradedModeSwitch:
+    """Chooses between the primary (ONNX) backend and a fast fallback.
+
+    The fallback is used when:
+        - the primary model is unavailable (None, e.g. file missing), or
+        - the primary missed its per-leaf latency budget on `window`
+          consecutive frames (CPU overloaded). The node then stays degraded
+          for `retry_after_sec` before trying the primary again.
+
+    `clock` can be replaced for deterministic runs.
+    """
+
+    def __init__(self, fallback, latency_budget_ms=400.0, window=3,
+                 retry_after_sec=60.0, clock=time.time):
+        self.fallback = fallback
+        self.latency_budget = float(latency_budget_ms) / 1000.0
+        self.window = int(window)
+        self.retry_after = float(retry_after_sec)
+        self.clock = clock
+
+        self._misses = 0
+        self._degraded_until = 0.0
+        self.degraded = False
+
+    def select(self, primary):
+        """Return the backend to use for the next frame."""
+
+        if primary is None:
+            self._set_degraded(True, "severity model unavailable")
+            return self.fallback
+
+        if self.clock() < self._degraded_until:
+            return self.fallback
+
+        self._set_degraded(False, "retrying severity model")
+        return primary
+
+    def record(self, backend, elapsed_sec, n_leaves):
+        """Report how long `backend` took for `n_leaves` crops."""
+
+        if backend is self.fallback or n_leaves == 0:
+            return
+
+        per_leaf = elapsed_sec / n_leaves
+        if per_leaf <= self.latency_budget:
+            self._misses = 0
+            return
+
+        self._misses += 1
+        if self._misses >= self.window:
+            self._misses = 0
+            self._degraded_until = self.clock() + self.retry_after
+            self._set_degraded(
+                True,
+                f"latency {per_leaf * 1000:.0f} ms/leaf over budget "
+                f"{self.latency_budget * 1000:.0f} ms",
+            )
+
+    def _set_degraded(self, degraded, reason):
+        if degraded == self.degraded:
+            return
+        self.degraded = degraded
+        if degraded:
+            print(f"⚠️ DEGRADED MODE: using {self.fallback.name} ({reason})")
+        else:
+            print(f"✅ Leaving degraded mode ({reason})")
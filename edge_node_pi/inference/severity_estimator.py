@@ -2,11 +2,25 @@ import cv2
 import numpy as np
 import onnxruntime as ort
 
+from inference.severity_backend import SeverityBackend
+
+
+class SeverityEstimator(SeverityBackend):
+    name = "onnx"
+
+    def __init__(self, model_path, intra_op_threads=None):
+        """intra_op_threads: limit ONNX Runtime's thread pool (None = all
+        cores). Background/shadow sessions use 1 so they do not compete
+        with the live model for cores.
+        """
+
+        options = ort.SessionOptions()
+        if intra_op_threads is not None:
+            options.intra_op_num_threads = int(intra_op_threads)
 
-class SeverityEstimator:
-    def __init__(self, model_path):
         self.session = ort.InferenceSession(
             model_path,
+            sess_options=options,
             providers=["CPUExecutionProvider"],
         )
         self.input_name = self.session.get_inputs()[0].name
@@ -68,9 +82,3 @@ class SeverityEstimator:
 
         percent = (infected_pixels / total_pixels) * 100.0
         return mask, float(percent)
-
-    def estimate(self, leaf):
-        """Estimate infected area percentage for a cropped leaf image."""
-
-        _, percent = self.mask_and_percent(leaf)
-        return percent
@@ -0,0 +1,60 @@
+import numpy as np
+
+from inference.leaf_quality import LeafQualityGate
+
+
+# BGR colors
+LESION_BROWN = (30, 70, 140)
+LEAF_GREEN = (40, 140, 60)
+SOIL = (60, 90, 120)
+
+
+def textured(color, size=128, seed=0):
+    # Solid color plus noise, so the crop is sharp enough for the blur check
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(-20, 21, size=(size, size, 3))
+    return np.clip(np.array(color) + noise, 0, 255).astype(np.uint8)
+
+
+def test_green_leaf_accepted():
+    gate = LeafQualityGate()
+
+    accepted, weight, reason = gate.check(textured(LEAF_GREEN))
+
+    assert accepted and reason is None
+    assert weight > 0
+
+
+def test_mostly_lesion_leaf_accepted():
+    gate = LeafQualityGate()
+    leaf = textured(LESION_BROWN)
+    leaf[:, :13] = textured(LEAF_GREEN, seed=1)[:, :13]  # ~10% green tissue left
+
+    _, _, leaf_ratio, green_ratio = gate.score(leaf)
+    accepted, _, reason = gate.check(leaf)
+
+    assert leaf_ratio > 0.9 and green_ratio < 0.15
+    assert accepted and reason is None
+
+
+def test_soil_rejected_as_background():
+    gate = LeafQualityGate()
+    soil = textured(SOIL)
+
+    _, _, leaf_ratio, green_ratio = gate.score(soil)
+    accepted, weight, reason = gate.check(soil)
+
+    # Soil passes the leaf-tissue ratio (same hue as lesions) but has no green
+    assert leaf_ratio > gate.min_leaf_ratio
+    assert green_ratio == 0.0
+    assert not accepted and weight == 0.0 and reason == "background"
+    assert gate.counters["background"] == 1
+
+
+def test_blurry_crop_rejected():
+    gate = LeafQualityGate()
+    flat = np.full((128, 128, 3), LEAF_GREEN, dtype=np.uint8)
+
+    accepted, _, reason = gate.check(flat)
+
+    assert not accepted and reason == "blurry"
@@ -0,0 +1,123 @@
+import os
+
+import numpy as np
+
+from inference.model_registry import ModelRegistry
+
+
+LIVE_BOXES = [(1, 10, 10, 60, 60, 0.9), (0, 100, 20, 160, 90, 0.8)]
+
+
+class FakeDetector:
+    # File content "<cls_offset> <dx>": classes shifted by cls_offset,
+    # boxes moved dx px right
+    def __init__(self, path):
+        with open(path) as f:
+            cls_offset, dx = (int(v) for v in f.read().split())
+        self.boxes = [
+            (cls + cls_offset, x1 + dx, y1, x2 + dx, y2, score)
+            for cls, x1, y1, x2, y2, score in LIVE_BOXES
+        ]
+
+    def detect(self, frame):
+        return list(self.boxes)
+
+
+class FakeSeverity:
+    # File content: the severity percent returned for every leaf
+    def __init__(self, path):
+        with open(path) as f:
+            self.percent = float(f.read())
+
+    def mask_and_percent(self, leaf):
+        return np.zeros(leaf.shape[:2], dtype=bool), self.percent
+
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def make_registry(tmp_path, mode="promote"):
+    write(tmp_path / "det.pt", "0 0")
+    write(tmp_path / "sev.onnx", "20")
+    models = ModelRegistry(
+        models_dir=str(tmp_path),
+        detector_file="det.pt",
+        severity_file="sev.onnx",
+        detector_factory=FakeDetector,
+        severity_factory=FakeSeverity,
+        watch=False,
+        mode=mode,
+        shadow_candidate_file="candidate.onnx",
+    )
+
+    frame = np.zeros((120, 200, 3), dtype=np.uint8)
+    leaves = [np.zeros((64, 64, 3), dtype=np.uint8)] * 2
+    for _ in range(3):
+        models.observe(frame, leaves, boxes=LIVE_BOXES, percents=[20.0, 20.0])
+    return models
+
+
+def load(models, kind, path, text):
+    write(path, text)
+    return models._load_candidate(kind, str(path), os.stat(path).st_mtime_ns)
+
+
+def test_detector_validated_against_live_boxes(tmp_path):
+    models = make_registry(tmp_path)
+    path = tmp_path / "det.pt"
+
+    assert load(models, "detector", path, "0 3")  # small shift still overlaps
+    assert not load(models, "detector", path, "0 80")  # no overlap
+    assert not load(models, "detector", path, "5 0")  # different class map
+
+    assert models.swap_pending()
+    assert models.detector.boxes[0][1] == 13
+
+
+def test_severity_validated_against_live_percents(tmp_path):
+    models = make_registry(tmp_path)
+    path = tmp_path / "sev.onnx"
+
+    assert not load(models, "severity", path, "80")
+    assert not load(models, "severity", path, "150")
+    assert load(models, "severity", path, "30")
+
+    models.swap_pending()
+    assert models.severity.percent == 30.0
+
+
+def test_shadow_watches_candidate_and_promotes_by_rename(tmp_path):
+    models = make_registry(tmp_path, mode="shadow")
+    live_path = tmp_path / "sev.onnx"
+    candidate = tmp_path / "candidate.onnx"
+
+    # The live file is not touched by a shadow candidate
+    assert load(models, "shadow", candidate, "25")
+    models.swap_pending()
+    assert models.shadow.percent == 25.0
+    assert models.severity.percent == 20.0
+    assert live_path.read_text() == "20"
+
+    assert models._load_promotion()
+    models.swap_pending()
+    assert models.severity.percent == 25.0
+    assert models.shadow is None
+    assert live_path.read_text() == "25"
+    assert not candidate.exists()
+    # The renamed file is not picked up again as a new live model
+    assert models._mtimes["severity"] == os.stat(live_path).st_mtime_ns
+
+
+def test_promotion_refused_if_candidate_changed(tmp_path):
+    models = make_registry(tmp_path, mode="shadow")
+    candidate = tmp_path / "candidate.onnx"
+
+    assert load(models, "shadow", candidate, "25")
+    models.swap_pending()
+
+    write(candidate, "26")
+    os.utime(candidate, ns=(0, 1))
+    assert not models._load_promotion()
+    assert (tmp_path / "sev.onnx").read_text() == "20"
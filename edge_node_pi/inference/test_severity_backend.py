@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from inference.severity_backend import DegradedModeSwitch, SeverityBackend
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+class FakeBackend(SeverityBackend):
+    def __init__(self, name, percent):
+        self.name = name
+        self.percent = percent
+
+    def mask_and_percent(self, leaf, threshold=0.5):
+        return np.zeros(leaf.shape[:2], dtype=bool), self.percent
+
+
+def make_switch(clock):
+    primary = FakeBackend("onnx", 40.0)
+    fallback = FakeBackend("color", 35.0)
+    switch = DegradedModeSwitch(
+        fallback, latency_budget_ms=100, window=3, retry_after_sec=60, clock=clock
+    )
+    return primary, fallback, switch
+
+
+def test_backend_must_implement_mask_and_percent():
+    class Incomplete(SeverityBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+    leaf = np.zeros((8, 8, 3), dtype=np.uint8)
+    assert FakeBackend("onnx", 12.5).estimate(leaf) == 12.5
+
+
+def test_missing_primary_uses_fallback():
+    primary, fallback, switch = make_switch(FakeClock())
+
+    assert switch.select(None) is fallback
+    assert switch.degraded
+
+    # Model file showed up again: used right away
+    assert switch.select(primary) is primary
+    assert not switch.degraded
+
+
+def test_degrades_after_window_of_slow_frames():
+    clock = FakeClock()
+    primary, fallback, switch = make_switch(clock)
+
+    # 2 leaves at 0.15 s/leaf, over the 100 ms budget
+    for _ in range(2):
+        switch.record(switch.select(primary), 0.3, 2)
+    assert switch.select(primary) is primary
+
+    # A fast frame resets the miss count
+    switch.record(primary, 0.1, 2)
+    for _ in range(2):
+        switch.record(switch.select(primary), 0.3, 2)
+    assert not switch.degraded
+
+    switch.record(switch.select(primary), 0.3, 2)
+    assert switch.degraded
+    assert switch.select(primary) is fallback
+
+    # Fallback timings and empty frames never count
+    switch.record(fallback, 10.0, 2)
+    switch.record(primary, 10.0, 0)
+    assert switch.select(primary) is fallback
+
+
+def test_retries_primary_after_timeout():
+    clock = FakeClock()
+    primary, fallback, switch = make_switch(clock)
+
+    for _ in range(3):
+        switch.record(switch.select(primary), 1.0, 1)
+
+    clock.t += 59.0
+    assert switch.select(primary) is fallback
+
+    clock.t += 2.0
+    assert switch.select(primary) is primary
+    assert not switch.degraded
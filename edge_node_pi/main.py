@@ -1,21 +1,18 @@
 import os
 
 import cv2
-import yaml
 
 from inference.leaf_detector import LeafDetector
 from inference.severity_estimator import SeverityEstimator
 from decision.decision_engine import decide
 from actuator.sprinkle import Sprinkler
+from utils.config import load_config
 
 
 # -----------------------------
 # LOAD CONFIG
 # -----------------------------
-with open("config.yaml", "r") as f:
-    config = yaml.safe_load(f)
-
-spr_cfg = config["sprinkler"]
+cfg = load_config("config.yaml")
 
 
 # -----------------------------
@@ -46,9 +43,9 @@ detector = LeafDetector(yolo_model_path, base_conf=0.3)
 severity_estimator = SeverityEstimator("models/severity_model.onnx")
 
 sprinkler = Sprinkler(
-    pin=spr_cfg["gpio_pin"],
-    max_duration=spr_cfg["max_duration_sec"],
-    cooldown=spr_cfg["cooldown_sec"],
+    pin=cfg.sprinkler.gpio_pin,
+    max_duration=cfg.sprinkler.max_duration_sec,
+    cooldown=cfg.sprinkler.cooldown_sec,
 )
 
 print("✅ SYSTEM READY (IMAGE MODE)")
@@ -60,8 +57,7 @@ try:
 
     # boxes: (cls, x1, y1, x2, y2, score)
     boxes = sorted(boxes, key=lambda b: b[5], reverse=True)
-    MAX_LEAVES_PER_FRAME = 5
-    boxes = boxes[:MAX_LEAVES_PER_FRAME]
+    boxes = boxes[: cfg.yolo.max_leaves_per_frame]
 
     print(f"🔍 Detected {len(boxes)} leaf candidates")
 
@@ -88,7 +84,7 @@ try:
     decision = decide(plant_percent)
     print(f"🚿 Decision: {decision}")
 
-    if spr_cfg.get("enabled", False):
+    if cfg.sprinkler.enabled:
         sprinkler.spray(decision)
 
 except Exception as e:
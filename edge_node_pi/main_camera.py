@@ -1,53 +1,152 @@
+import os
+
 import cv2
-import yaml
 import time
 from collections import deque
 
 from camera.camera import Camera
 from inference.leaf_detector import LeafDetector
 from inference.severity_estimator import SeverityEstimator
+from inference.model_registry import ModelRegistry
+from inference.leaf_quality import LeafQualityGate
+from inference.color_severity import ColorSeverityEstimator
+from inference.severity_backend import DegradedModeSwitch
 from decision.decision_engine import decide
+from decision.coverage_map import SprayCoverageMap
 from actuator.sprinkle import Sprinkler
+from display.renderer import AnnotationRenderer
+from display.snapshot_server import SnapshotServer
+from position.position_source import make_position_source
+from utils.config import ConfigWatcher
 
 
 # =============================
 # LOAD CONFIG
 # =============================
-with open("config.yaml", "r") as f:
-    config = yaml.safe_load(f)
-
-spr_cfg = config["sprinkler"]
-cam_cfg = config.get("camera", {})
-CAPTURE_INTERVAL = config.get("capture_interval_sec", 2)
-
-# YOLO class IDs that correspond to infected leaves.
-# This can be overridden from config.yaml under key:
-#   yolo:
-#     infected_class_ids: [1]
-yolo_cfg = config.get("yolo", {})
-INFECTED_CLASS_IDS = set(yolo_cfg.get("infected_class_ids", [1]))
+# Validated once here; safe fields (thresholds, interval, leaf cap,
+# sprinkler durations) are re-applied live between frames on file changes.
+config_watcher = ConfigWatcher("config.yaml")
+cfg = config_watcher.config
 
 
 # =============================
 # INITIALIZE COMPONENTS
 # =============================
 camera = Camera(
-    device_id=cam_cfg.get("device_id", 0),
-    width=cam_cfg.get("width", 640),
-    height=cam_cfg.get("height", 480),
+    device_id=cfg.camera.device_id,
+    width=cfg.camera.width,
+    height=cfg.camera.height,
 )
 
 print("📷 Camera initialized")
 
-detector = LeafDetector("models/yolov11n.pt", base_conf=0.2)
-severity_estimator = SeverityEstimator("models/severity_model.onnx")
+models = ModelRegistry(
+    models_dir=cfg.models.dir,
+    detector_file=cfg.models.detector,
+    severity_file=cfg.models.severity,
+    shadow_candidate_file=cfg.models.shadow_candidate,
+    detector_factory=lambda path: LeafDetector(path, base_conf=cfg.yolo.conf),
+    severity_factory=SeverityEstimator,
+    # Shadow sessions get one thread so they never take cores from the live model
+    shadow_factory=lambda path: SeverityEstimator(path, intra_op_threads=1),
+    watch=cfg.models.watch,
+    poll_interval=cfg.models.poll_interval_sec,
+    mode=cfg.models.mode,
+    shadow_fraction=cfg.models.shadow_fraction,
+    shadow_cpu_budget=cfg.models.shadow_cpu_budget,
+    severity_optional=cfg.severity.allow_missing_model,
+)
+models.start()
+
+# Fast classical estimator used when the ONNX model is missing or too slow
+severity_switch = DegradedModeSwitch(
+    ColorSeverityEstimator(rgb=True),
+    latency_budget_ms=cfg.severity.latency_budget_ms,
+    window=cfg.severity.window,
+    retry_after_sec=cfg.severity.retry_after_sec,
+)
+
+quality_gate = LeafQualityGate(
+    sample_size=cfg.quality_gate.sample_size,
+    min_sharpness=cfg.quality_gate.min_sharpness,
+    max_clipped_fraction=cfg.quality_gate.max_clipped_fraction,
+    min_leaf_ratio=cfg.quality_gate.min_leaf_ratio,
+    min_green_ratio=cfg.quality_gate.min_green_ratio,
+    weighting=cfg.quality_gate.weighting,
+)
 
 sprinkler = Sprinkler(
-    pin=spr_cfg["gpio_pin"],
-    max_duration=spr_cfg["max_duration_sec"],
-    cooldown=spr_cfg["cooldown_sec"],
+    pin=cfg.sprinkler.gpio_pin,
+    max_duration=cfg.sprinkler.max_duration_sec,
+    cooldown=cfg.sprinkler.cooldown_sec,
+    min_interval=cfg.sprinkler.min_interval_sec,
 )
 
+snapshot_server = None
+if cfg.snapshot.enabled:
+    snapshot_server = SnapshotServer(
+        host=cfg.snapshot.host,
+        port=cfg.snapshot.port,
+        quality=cfg.snapshot.quality,
+        scale=cfg.snapshot.scale,
+        stream_fps=cfg.snapshot.stream_fps,
+    )
+    snapshot_server.start()
+
+
+position_source = make_position_source(
+    cfg.position.source,
+    lat=cfg.position.lat,
+    lng=cfg.position.lng,
+    heading_deg=cfg.position.heading_deg,
+    speed_mps=cfg.position.speed_mps,
+)
+
+# Where/when we sprayed, so the same spot is not treated again on the next pass
+coverage = None
+if cfg.coverage.enabled and position_source is not None:
+    if cfg.coverage.log_path:
+        os.makedirs(os.path.dirname(cfg.coverage.log_path) or ".", exist_ok=True)
+    coverage = SprayCoverageMap(
+        cell_size_m=cfg.coverage.cell_size_m,
+        radius_m=cfg.coverage.radius_m,
+        ttl_sec=cfg.coverage.ttl_sec,
+        log_path=cfg.coverage.log_path or None,
+    )
+
+
+def apply_live_config(cfg):
+    """Push the live-reloadable config fields into running components."""
+
+    models.detector.base_conf = cfg.yolo.conf
+    models.shadow_fraction = cfg.models.shadow_fraction
+    models.shadow_cpu_budget = cfg.models.shadow_cpu_budget
+
+    severity_switch.latency_budget = cfg.severity.latency_budget_ms / 1000.0
+    severity_switch.window = cfg.severity.window
+    severity_switch.retry_after = cfg.severity.retry_after_sec
+
+    quality_gate.min_sharpness = cfg.quality_gate.min_sharpness
+    quality_gate.max_clipped_fraction = cfg.quality_gate.max_clipped_fraction
+    quality_gate.min_leaf_ratio = cfg.quality_gate.min_leaf_ratio
+    quality_gate.min_green_ratio = cfg.quality_gate.min_green_ratio
+    quality_gate.weighting = cfg.quality_gate.weighting
+
+    sprinkler.max_duration = cfg.sprinkler.max_duration_sec
+    sprinkler.cooldown = cfg.sprinkler.cooldown_sec
+    sprinkler.min_interval = cfg.sprinkler.min_interval_sec
+
+    if snapshot_server is not None:
+        snapshot_server.encoder.quality = cfg.snapshot.quality
+        snapshot_server.encoder.scale = cfg.snapshot.scale
+
+    if coverage is not None:
+        coverage.radius = cfg.coverage.radius_m
+        coverage.ttl = cfg.coverage.ttl_sec
+
+
+config_watcher.start()
+
 print("✅ SYSTEM READY (RASPBERRY PI MODE)")
 
 
@@ -55,12 +154,12 @@ print("✅ SYSTEM READY (RASPBERRY PI MODE)")
 # STATE VARIABLES
 # =============================
 last_inference_time = 0.0
-last_boxes = []
 last_plant_percent = 0.0
 last_decision = "N/A"
 
-# Last captured frame (for visualization)
-last_frame = None
+# Cached annotated frame (redrawn only when inference results change)
+renderer = AnnotationRenderer()
+last_snapshot_version = -1
 
 # For temporal smoothing
 BOX_HISTORY = deque(maxlen=3)
@@ -79,10 +178,20 @@ try:
     while True:
         now = time.time()
 
+        # ---- Apply config changes between frames ----
+        update = config_watcher.poll_update()
+        if update is not None:
+            cfg, changed = update
+            apply_live_config(cfg)
+            print(f"🔧 Applied live config: {', '.join(changed)}")
+
         # ---- Periodic inference ----
-        if now - last_inference_time >= CAPTURE_INTERVAL:
+        if now - last_inference_time >= cfg.capture_interval_sec:
             print("\n📸 Running inference...")
 
+            # Hot-swap validated models between frames
+            models.swap_pending()
+
             frame = camera.capture()
             if frame is None:
                 time.sleep(0.05)
@@ -95,13 +204,13 @@ try:
             last_frame_time = now
 
             H, W, _ = frame.shape
-            boxes = detector.detect(frame)
+            detections = models.detector.detect(frame)
 
             # ---- FILTER BY YOLO CLASS (ONLY INFECTED LEAVES) ----
             boxes = [
                 (cls, x1, y1, x2, y2, score)
-                for cls, x1, y1, x2, y2, score in boxes
-                if cls in INFECTED_CLASS_IDS
+                for cls, x1, y1, x2, y2, score in detections
+                if cls in cfg.yolo.infected_class_ids
             ]
 
             # ---- GEOMETRIC FILTERING ----
@@ -123,13 +232,18 @@ try:
 
                 filtered.append((cls, x1, y1, x2, y2, score))
 
-            boxes = filtered[:5]  # limit leaves per frame
+            boxes = filtered[: cfg.yolo.max_leaves_per_frame]  # limit leaves per frame
 
             # ---- TEMPORAL SMOOTHING ----
             BOX_HISTORY.append(boxes)
             boxes = max(BOX_HISTORY, key=len, default=boxes)
 
             infected_values = []
+            weights = []
+            leaves = []
+
+            severity = severity_switch.select(models.severity)
+            severity_time = 0.0
 
             for cls, x1, y1, x2, y2, score in boxes:
                 leaf = frame[y1:y2, x1:x2]
@@ -139,30 +253,68 @@ try:
                 if leaf.shape[0] < 64 or leaf.shape[1] < 64:
                     continue
 
+                # ---- QUALITY GATE (skip blurry / badly exposed / background crops) ----
+                weight = 1.0
+                if cfg.quality_gate.enabled:
+                    accepted, weight, reason = quality_gate.check(leaf)
+                    if not accepted:
+                        print(f"🚫 Leaf skipped ({reason}) | conf={score:.2f}")
+                        continue
+
                 # Preprocess for segmentation
                 leaf = cv2.GaussianBlur(leaf, (5, 5), 0)
                 leaf = cv2.cvtColor(leaf, cv2.COLOR_BGR2RGB)
 
-                percent = severity_estimator.estimate(leaf)
+                t0 = time.time()
+                percent = severity.estimate(leaf)
+                severity_time += time.time() - t0
                 infected_values.append(percent)
+                weights.append(weight)
+                leaves.append(leaf)
 
-                print(f"🌿 Leaf severity: {percent:.2f}% | conf={score:.2f}")
+                print(
+                    f"🌿 Leaf severity: {percent:.2f}% | conf={score:.2f} "
+                    f"| weight={weight:.2f}"
+                )
+
+            severity_switch.record(severity, severity_time, len(leaves))
 
             if infected_values:
-                plant_percent = sum(infected_values) / len(infected_values)
+                plant_percent = sum(
+                    p * w for p, w in zip(infected_values, weights)
+                ) / sum(weights)
             else:
                 plant_percent = 0.0
 
-            decision = decide(plant_percent)
+            if cfg.quality_gate.enabled:
+                print(f"🧪 Quality gate: {quality_gate.summary()}")
+
+            position = position_source.read() if position_source else None
+            decision = decide(plant_percent, position=position, coverage=coverage)
+
+            # Live numbers come from the color fallback while degraded,
+            # which would make validation and shadow drift stats meaningless
+            live_severity = severity is models.severity
+            models.observe(
+                frame,
+                leaves,
+                boxes=detections,
+                percents=infected_values if live_severity else None,
+            )
+            if live_severity:
+                models.submit_shadow(leaves, infected_values)
 
             print(f"🌱 Plant infection: {plant_percent:.2f}%")
             print(f"🚿 Decision: {decision}")
 
-            if spr_cfg["enabled"]:
-                sprinkler.spray(decision)
+            if cfg.sprinkler.enabled:
+                # Per-location dedup replaces the global cooldown when active
+                dedup = coverage is not None and position is not None
+                sprayed = sprinkler.spray(decision, bypass_cooldown=dedup)
+                if sprayed and dedup:
+                    coverage.record(position, amount=decision["amount"])
 
-            last_frame = frame
-            last_boxes = boxes
+            renderer.update(frame, boxes)
             last_plant_percent = plant_percent
             last_decision = decision
             last_inference_time = now
@@ -170,38 +322,22 @@ try:
         # =============================
         # VISUALIZATION
         # =============================
-        if last_frame is None:
-            time.sleep(0.02)
-            continue
-
-        display = last_frame.copy()
-
-        for cls, x1, y1, x2, y2, score in last_boxes:
-            cv2.rectangle(display, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            cv2.putText(
-                display,
-                f"{score:.2f}",
-                (x1, y1 - 8),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.5,
-                (0, 255, 0),
-                1,
-            )
-
         status = (
             f"Infection: {last_plant_percent:.1f}% | "
             f"Decision: {last_decision} | FPS: {fps:.1f}"
         )
+        if severity_switch.degraded:
+            status += " | DEGRADED"
 
-        cv2.putText(
-            display,
-            status,
-            (10, 30),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.7,
-            (255, 255, 255),
-            2,
-        )
+        display = renderer.render(status)
+        if display is None:
+            time.sleep(0.02)
+            continue
+
+        # Hand new annotated frames to the snapshot encoder thread
+        if snapshot_server is not None and renderer.version != last_snapshot_version:
+            snapshot_server.submit(display)
+            last_snapshot_version = renderer.version
 
         cv2.imshow("AI Plant Monitoring (Pi)", display)
 
@@ -218,7 +354,13 @@ except KeyboardInterrupt:
     print("\n🛑 Stopped by user")
 
 finally:
+    config_watcher.stop()
+    if position_source is not None:
+        position_source.close()
     camera.release()
     sprinkler.cleanup()
+    models.stop()
+    if snapshot_server is not None:
+        snapshot_server.stop()
     cv2.destroyAllWindows()
     print("🧹 Cleanup complete")
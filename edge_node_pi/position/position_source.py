@@ -0,0 +1,65 @@
+import math
+import time
+from abc import ABC, abstractmethod
+
+
+# Meters per degree of latitude (spherical Earth approximation)
+METERS_PER_DEG = 111320.0
+
+
+class PositionSource(ABC):
+    """Provides the robot's current position as (lat, lng) or None."""
+
+    @abstractmethod
+    def read(self):
+        """Return the current (lat, lng), or None if unknown."""
+
+    def close(self):
+        pass
+
+
+class StaticPositionSource(PositionSource):
+    """Fixed position (e.g. a stationary test rig)."""
+
+    def __init__(self, lat, lng):
+        self.position = (float(lat), float(lng))
+
+    def read(self):
+        return self.position
+
+
+class SimulatedPositionSource(PositionSource):
+    """Robot driving in a straight line at constant speed.
+
+    Mirrors the frontend stream simulator so spray coverage can be tested
+    without GPS hardware. `clock` can be replaced for deterministic runs.
+    """
+
+    def __init__(self, lat, lng, heading_deg=0.0, speed_mps=0.3, clock=time.time):
+        self.lat0 = float(lat)
+        self.lng0 = float(lng)
+        self.heading = math.radians(float(heading_deg))
+        self.speed = float(speed_mps)
+        self.clock = clock
+        self.start = clock()
+
+    def read(self):
+        dist = (self.clock() - self.start) * self.speed
+        north = math.cos(self.heading) * dist
+        east = math.sin(self.heading) * dist
+
+        lat = self.lat0 + north / METERS_PER_DEG
+        lng = self.lng0 + east / (METERS_PER_DEG * math.cos(math.radians(self.lat0)))
+        return lat, lng
+
+
+def make_position_source(kind, lat=0.0, lng=0.0, heading_deg=0.0, speed_mps=0.3):
+    """Build a position source by name ("none", "static", "simulated")."""
+
+    if kind == "none":
+        return None
+    if kind == "static":
+        return StaticPositionSource(lat, lng)
+    if kind == "simulated":
+        return SimulatedPositionSource(lat, lng, heading_deg, speed_mps)
+    raise ValueError(f"Unknown position source: {kind}")
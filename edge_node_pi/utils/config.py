@@ -0,0 +1,389 @@
+# edge/utils/config.py
+
+import dataclasses
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+import yaml
+
+
+class ConfigError(ValueError):
+    """Raised when config.yaml is invalid or a reload changes unsafe fields."""
+
+
+def _check(cond, msg):
+    if not cond:
+        raise ConfigError(msg)
+
+
+# =============================
+# TYPED SECTIONS
+# =============================
+@dataclass(frozen=True)
+class CameraConfig:
+    device_id: int = 0
+    width: int = 640
+    height: int = 480
+
+    def __post_init__(self):
+        _check(self.width > 0 and self.height > 0, "camera: width/height must be > 0")
+
+
+@dataclass(frozen=True)
+class SprinklerConfig:
+    enabled: bool = False
+    gpio_pin: int = 21
+    max_duration_sec: float = 10.0
+    cooldown_sec: float = 30.0
+    min_interval_sec: float = 2.0
+
+    def __post_init__(self):
+        _check(0 <= self.gpio_pin <= 27, "sprinkler.gpio_pin must be a BCM pin (0-27)")
+        _check(self.max_duration_sec >= 0, "sprinkler.max_duration_sec must be >= 0")
+        _check(self.cooldown_sec >= 0, "sprinkler.cooldown_sec must be >= 0")
+        _check(self.min_interval_sec >= 0, "sprinkler.min_interval_sec must be >= 0")
+
+
+@dataclass(frozen=True)
+class YoloConfig:
+    infected_class_ids: tuple = (1,)
+    conf: float = 0.2
+    max_leaves_per_frame: int = 5
+
+    def __post_init__(self):
+        _check(0.0 < self.conf < 1.0, "yolo.conf must be in (0, 1)")
+        _check(self.max_leaves_per_frame > 0, "yolo.max_leaves_per_frame must be > 0")
+
+
+@dataclass(frozen=True)
+class QualityGateConfig:
+    enabled: bool = True
+    sample_size: int = 64
+    min_sharpness: float = 30.0
+    max_clipped_fraction: float = 0.4
+    min_leaf_ratio: float = 0.15
+    min_green_ratio: float = 0.03
+    weighting: bool = True
+
+    def __post_init__(self):
+        _check(self.sample_size >= 8, "quality_gate.sample_size must be >= 8")
+        _check(self.min_sharpness >= 0, "quality_gate.min_sharpness must be >= 0")
+        _check(
+            0.0 < self.max_clipped_fraction <= 1.0,
+            "quality_gate.max_clipped_fraction must be in (0, 1]",
+        )
+        _check(
+            0.0 <= self.min_leaf_ratio < 1.0,
+            "quality_gate.min_leaf_ratio must be in [0, 1)",
+        )
+        _check(
+            0.0 <= self.min_green_ratio <= self.min_leaf_ratio,
+            "quality_gate.min_green_ratio must be in [0, min_leaf_ratio]",
+        )
+
+
+@dataclass(frozen=True)
+class SeverityConfig:
+    allow_missing_model: bool = True
+    latency_budget_ms: float = 400.0
+    window: int = 3
+    retry_after_sec: float = 60.0
+
+    def __post_init__(self):
+        _check(self.latency_budget_ms > 0, "severity.latency_budget_ms must be > 0")
+        _check(self.window > 0, "severity.window must be > 0")
+        _check(self.retry_after_sec >= 0, "severity.retry_after_sec must be >= 0")
+
+
+@dataclass(frozen=True)
+class ModelsConfig:
+    dir: str = "models"
+    detector: str = "yolov11n.pt"
+    severity: str = "severity_model.onnx"
+    watch: bool = True
+    poll_interval_sec: float = 2.0
+    mode: str = "promote"
+    shadow_candidate: str = "severity_candidate.onnx"
+    shadow_fraction: float = 0.2
+    shadow_cpu_budget: float = 0.25
+
+    def __post_init__(self):
+        _check(self.mode in ("promote", "shadow"), "models.mode must be promote/shadow")
+        _check(self.poll_interval_sec > 0, "models.poll_interval_sec must be > 0")
+        _check(
+            0.0 <= self.shadow_fraction <= 1.0,
+            "models.shadow_fraction must be in [0, 1]",
+        )
+        _check(
+            0.0 <= self.shadow_cpu_budget <= 1.0,
+            "models.shadow_cpu_budget must be in [0, 1]",
+        )
+
+
+@dataclass(frozen=True)
+class SnapshotConfig:
+    enabled: bool = False
+    host: str = "0.0.0.0"
+    port: int = 8080
+    quality: int = 75
+    scale: float = 0.5
+    stream_fps: float = 10.0
+
+    def __post_init__(self):
+        _check(0 < self.port < 65536, "snapshot.port must be in 1-65535")
+        _check(0 <= self.quality <= 100, "snapshot.quality must be in 0-100")
+        _check(0.0 < self.scale <= 1.0, "snapshot.scale must be in (0, 1]")
+
+
+@dataclass(frozen=True)
+class PositionConfig:
+    source: str = "none"
+    lat: float = 0.0
+    lng: float = 0.0
+    heading_deg: float = 0.0
+    speed_mps: float = 0.3
+
+    def __post_init__(self):
+        _check(
+            self.source in ("none", "static", "simulated"),
+            "position.source must be none/static/simulated",
+        )
+        _check(-90.0 <= self.lat <= 90.0, "position.lat must be in [-90, 90]")
+        _check(-180.0 <= self.lng <= 180.0, "position.lng must be in [-180, 180]")
+
+
+@dataclass(frozen=True)
+class CoverageConfig:
+    enabled: bool = True
+    cell_size_m: float = 1.0
+    radius_m: float = 0.75
+    ttl_sec: float = 86400.0
+    log_path: str = "output/spray_coverage.jsonl"
+
+    def __post_init__(self):
+        _check(self.cell_size_m > 0, "coverage.cell_size_m must be > 0")
+        _check(self.radius_m >= 0, "coverage.radius_m must be >= 0")
+        _check(self.ttl_sec >= 0, "coverage.ttl_sec must be >= 0")
+
+
+@dataclass(frozen=True)
+class EdgeConfig:
+    capture_interval_sec: float = 10.0
+    camera: CameraConfig = field(default_factory=CameraConfig)
+    sprinkler: SprinklerConfig = field(default_factory=SprinklerConfig)
+    yolo: YoloConfig = field(default_factory=YoloConfig)
+    quality_gate: QualityGateConfig = field(default_factory=QualityGateConfig)
+    severity: SeverityConfig = field(default_factory=SeverityConfig)
+    models: ModelsConfig = field(default_factory=ModelsConfig)
+    snapshot: SnapshotConfig = field(default_factory=SnapshotConfig)
+    position: PositionConfig = field(default_factory=PositionConfig)
+    coverage: CoverageConfig = field(default_factory=CoverageConfig)
+
+    def __post_init__(self):
+        _check(self.capture_interval_sec > 0, "capture_interval_sec must be > 0")
+
+
+# Fields that can change while the pipeline runs (applied between frames).
+# Anything else (camera device, GPIO pin, enabling the sprinkler, model
+# files, server address...) needs a restart.
+LIVE_FIELDS = frozenset(
+    {
+        "capture_interval_sec",
+        "sprinkler.max_duration_sec",
+        "sprinkler.cooldown_sec",
+        "sprinkler.min_interval_sec",
+        "yolo.infected_class_ids",
+        "yolo.conf",
+        "yolo.max_leaves_per_frame",
+        "quality_gate.enabled",
+        "quality_gate.min_sharpness",
+        "quality_gate.max_clipped_fraction",
+        "quality_gate.min_leaf_ratio",
+        "quality_gate.min_green_ratio",
+        "quality_gate.weighting",
+        "severity.latency_budget_ms",
+        "severity.window",
+        "severity.retry_after_sec",
+        "models.shadow_fraction",
+        "models.shadow_cpu_budget",
+        "snapshot.quality",
+        "snapshot.scale",
+        "coverage.radius_m",
+        "coverage.ttl_sec",
+    }
+)
+
+
+# =============================
+# PARSING / VALIDATION
+# =============================
+def _coerce(value, typ, name):
+    if dataclasses.is_dataclass(typ):
+        if value is None:
+            value = {}
+        _check(isinstance(value, dict), f"{name} must be a mapping")
+        return _build(typ, value, name + ".")
+    if typ is bool:
+        _check(isinstance(value, bool), f"{name} must be true/false")
+        return value
+    if typ is int:
+        _check(
+            isinstance(value, int) and not isinstance(value, bool),
+            f"{name} must be an integer",
+        )
+        return value
+    if typ is float:
+        _check(
+            isinstance(value, (int, float)) and not isinstance(value, bool),
+            f"{name} must be a number",
+        )
+        return float(value)
+    if typ is str:
+        _check(isinstance(value, str), f"{name} must be a string")
+        return value
+    if typ is tuple:
+        _check(isinstance(value, (list, tuple)), f"{name} must be a list")
+        _check(
+            all(isinstance(v, int) and not isinstance(v, bool) for v in value),
+            f"{name} must be a list of integers",
+        )
+        return tuple(value)
+    raise ConfigError(f"{name}: unsupported type {typ}")
+
+
+def _build(cls, raw, prefix=""):
+    fields = {f.name: f for f in dataclasses.fields(cls)}
+    unknown = sorted(set(raw) - set(fields))
+    _check(
+        not unknown,
+        f"Unknown config keys: {', '.join(prefix + k for k in unknown)}",
+    )
+
+    kwargs = {
+        name: _coerce(raw[name], f.type, prefix + name)
+        for name, f in fields.items()
+        if name in raw
+    }
+    return cls(**kwargs)
+
+
+def parse_config(raw):
+    """Build a validated EdgeConfig from a parsed YAML mapping."""
+
+    if raw is None:
+        raw = {}
+    _check(isinstance(raw, dict), "config root must be a mapping")
+    return _build(EdgeConfig, raw)
+
+
+def load_config(path="config.yaml"):
+    """Read and validate config.yaml (raises ConfigError on bad values)."""
+
+    with open(path, "r") as f:
+        try:
+            raw = yaml.safe_load(f)
+        except yaml.YAMLError as e:
+            raise ConfigError(f"Invalid YAML in {path}: {e}") from e
+    return parse_config(raw)
+
+
+def diff_config(old, new, prefix=""):
+    """Return the dotted names of fields that differ between two configs."""
+
+    changed = []
+    for f in dataclasses.fields(old):
+        a, b = getattr(old, f.name), getattr(new, f.name)
+        if dataclasses.is_dataclass(a):
+            changed.extend(diff_config(a, b, prefix + f.name + "."))
+        elif a != b:
+            changed.append(prefix + f.name)
+    return changed
+
+
+# =============================
+# HOT RELOAD
+# =============================
+class ConfigWatcher:
+    """Polls config.yaml for changes and stages safe updates.
+
+    A background thread checks the file mtime every `poll_interval`
+    seconds. A changed file is parsed and validated; if it only touches
+    `LIVE_FIELDS` it is staged, otherwise the reload is rejected with a
+    message naming the fields that require a restart, and the running
+    config stays as it is. The main loop picks staged updates up between
+    frames with `poll_update()`.
+    """
+
+    def __init__(self, path="config.yaml", poll_interval=2.0):
+        self.path = path
+        self.poll_interval = float(poll_interval)
+        self.config = load_config(path)
+
+        self._mtime = self._stat()
+        self._staged = None
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def poll_update(self):
+        """Return (config, changed_fields) if a reload is staged, else None.
+
+        Call between frames only.
+        """
+
+        if self._staged is None:
+            return None
+        with self._lock:
+            staged, self._staged = self._staged, None
+        self.config = staged[0]
+        return staged
+
+    def _watch_loop(self):
+        while self._running:
+            time.sleep(self.poll_interval)
+
+            mtime = self._stat()
+            if mtime is None or mtime == self._mtime:
+                continue
+            self._mtime = mtime
+
+            try:
+                self._reload()
+            except (ConfigError, OSError) as e:
+                print(f"❌ Config reload rejected: {e}")
+
+    def _reload(self):
+        new = load_config(self.path)
+
+        changed = diff_config(self.config, new)
+        if not changed:
+            return
+
+        unsafe = [name for name in changed if name not in LIVE_FIELDS]
+        _check(
+            not unsafe,
+            f"{', '.join(unsafe)} cannot change while running (restart required)",
+        )
+
+        with self._lock:
+            self._staged = (new, changed)
+        print(f"🔧 Config reloaded: {', '.join(changed)}")
@@ -0,0 +1,129 @@
+import dataclasses
+
+import pytest
+import yaml
+
+from utils.config import (
+    LIVE_FIELDS,
+    ConfigError,
+    ConfigWatcher,
+    EdgeConfig,
+    diff_config,
+    load_config,
+    parse_config,
+)
+
+
+def write_config(path, raw):
+    with open(path, "w") as f:
+        yaml.safe_dump(raw, f)
+
+
+def test_defaults_and_shipped_config_load():
+    assert parse_config(None) == EdgeConfig()
+    assert isinstance(load_config("config.yaml"), EdgeConfig)
+
+
+def test_type_coercion():
+    cfg = parse_config(
+        {
+            "capture_interval_sec": 5,  # int accepted for float fields
+            "sprinkler": {"enabled": True, "gpio_pin": 18},
+            "yolo": {"infected_class_ids": [1, 2]},
+        }
+    )
+
+    assert cfg.capture_interval_sec == 5.0
+    assert isinstance(cfg.capture_interval_sec, float)
+    assert cfg.sprinkler.enabled is True
+    assert cfg.yolo.infected_class_ids == (1, 2)
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        {"sprinkler": {"enabled": 1}},  # int is not a bool
+        {"sprinkler": {"gpio_pin": True}},  # bool is not an int
+        {"sprinkler": {"gpio_pin": 21.0}},
+        {"capture_interval_sec": False},
+        {"yolo": {"infected_class_ids": [1, True]}},
+        {"camera": "usb0"},
+    ],
+)
+def test_wrong_types_rejected(raw):
+    with pytest.raises(ConfigError):
+        parse_config(raw)
+
+
+def test_unknown_keys_rejected():
+    with pytest.raises(ConfigError, match="Unknown config keys: sprinkler.gpio"):
+        parse_config({"sprinkler": {"gpio": 21}})
+    with pytest.raises(ConfigError, match="Unknown config keys: camra"):
+        parse_config({"camra": {}})
+
+
+def test_out_of_range_rejected():
+    with pytest.raises(ConfigError, match="gpio_pin"):
+        parse_config({"sprinkler": {"gpio_pin": 40}})
+
+
+def test_diff_config():
+    old = EdgeConfig()
+    new = parse_config({"yolo": {"conf": 0.5}, "camera": {"width": 320}})
+
+    assert diff_config(old, old) == []
+    assert sorted(diff_config(old, new)) == ["camera.width", "yolo.conf"]
+
+
+def test_live_fields_exist():
+    # Every live field names a real (leaf) config field
+    known = set()
+
+    def collect(cfg, prefix=""):
+        for f in dataclasses.fields(cfg):
+            value = getattr(cfg, f.name)
+            if dataclasses.is_dataclass(value):
+                collect(value, prefix + f.name + ".")
+            else:
+                known.add(prefix + f.name)
+
+    collect(EdgeConfig())
+    assert LIVE_FIELDS <= known
+    assert "sprinkler.gpio_pin" not in LIVE_FIELDS
+    assert "sprinkler.enabled" not in LIVE_FIELDS
+
+
+def test_watcher_stages_live_reload(tmp_path):
+    path = tmp_path / "config.yaml"
+    write_config(path, {"yolo": {"conf": 0.2}})
+    watcher = ConfigWatcher(str(path))
+
+    assert watcher.poll_update() is None
+
+    write_config(path, {"yolo": {"conf": 0.4}, "sprinkler": {"cooldown_sec": 5}})
+    watcher._reload()
+
+    cfg, changed = watcher.poll_update()
+    assert sorted(changed) == ["sprinkler.cooldown_sec", "yolo.conf"]
+    assert cfg.yolo.conf == 0.4
+    assert watcher.config is cfg
+    assert watcher.poll_update() is None
+
+
+def test_watcher_rejects_unsafe_reload(tmp_path):
+    path = tmp_path / "config.yaml"
+    write_config(path, {"yolo": {"conf": 0.2}})
+    watcher = ConfigWatcher(str(path))
+    old = watcher.config
+
+    write_config(path, {"yolo": {"conf": 0.4}, "sprinkler": {"gpio_pin": 18}})
+    with pytest.raises(ConfigError, match="sprinkler.gpio_pin cannot change"):
+        watcher._reload()
+
+    # Invalid values are rejected too, keeping the running config
+    write_config(path, {"yolo": {"conf": 2.0}})
+    with pytest.raises(ConfigError):
+        watcher._reload()
+
+    assert watcher.poll_update() is None
+    assert watcher.config is old
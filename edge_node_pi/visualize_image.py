@@ -2,18 +2,22 @@ import os
 import sys
 
 import cv2
-import yaml
 
 from inference.leaf_detector import LeafDetector
 from inference.severity_estimator import SeverityEstimator
+from display.renderer import AnnotationRenderer
+from utils.config import load_config
 
 
 def main():
     # -----------------------------
     # Parse args / defaults
     # -----------------------------
-    if len(sys.argv) > 1:
-        image_path = sys.argv[1]
+    args = [a for a in sys.argv[1:] if a != "--headless"]
+    headless = "--headless" in sys.argv[1:]
+
+    if args:
+        image_path = args[0]
     else:
         image_path = "input_images/test.jpg"
 
@@ -23,10 +27,7 @@ def main():
     # -----------------------------
     # Load config
     # -----------------------------
-    with open("config.yaml", "r") as f:
-        config = yaml.safe_load(f)
-
-    spr_cfg = config.get("sprinkler", {})
+    cfg = load_config("config.yaml")
 
     # -----------------------------
     # Backend / models
@@ -67,58 +68,36 @@ def main():
     # -----------------------------
     boxes = detector.detect(frame)
     boxes = sorted(boxes, key=lambda b: b[5], reverse=True)
-    MAX_LEAVES_PER_FRAME = 5
-    boxes = boxes[:MAX_LEAVES_PER_FRAME]
+    boxes = boxes[: cfg.yolo.max_leaves_per_frame]
 
     print(f"🔍 Detected {len(boxes)} leaf candidates")
 
-    vis_frame = frame.copy()
+    drawn_boxes, masks, labels, colors = [], [], [], []
 
     for idx, (cls, x1, y1, x2, y2, score) in enumerate(boxes, start=1):
         leaf = frame[y1:y2, x1:x2]
         if leaf.size == 0:
             continue
 
-        # Get segmentation mask (224x224) and infection percent
+        # Get segmentation mask (224x224) and infection percent; the renderer
+        # resizes it into the box and blends it in place.
         mask, percent = severity_estimator.mask_and_percent(leaf, threshold=0.5)
 
-        # Resize mask back to the leaf crop size
-        mask_uint8 = (mask.astype("uint8") * 255)
-        mask_resized = cv2.resize(
-            mask_uint8,
-            (leaf.shape[1], leaf.shape[0]),
-            interpolation=cv2.INTER_NEAREST,
-        )
-
-        # Create red overlay where mask is positive
-        overlay = leaf.copy()
-        red = (0, 0, 255)
-        overlay[mask_resized > 0] = red
-
-        # Blend overlay with original leaf region
-        blended = cv2.addWeighted(leaf, 0.6, overlay, 0.4, 0)
-        vis_frame[y1:y2, x1:x2] = blended
-
-        color = (0, 255, 0) if cls == 0 else (0, 0, 255)
-        cv2.rectangle(vis_frame, (x1, y1), (x2, y2), color, 2)
-
-        label = f"#{idx} {percent:.1f}% | conf={score:.2f}"
-        cv2.putText(
-            vis_frame,
-            label,
-            (x1, max(0, y1 - 10)),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.5,
-            color,
-            1,
-            cv2.LINE_AA,
-        )
+        drawn_boxes.append((cls, x1, y1, x2, y2, score))
+        masks.append(mask)
+        labels.append(f"#{idx} {percent:.1f}% | conf={score:.2f}")
+        colors.append((0, 255, 0) if cls == 0 else (0, 0, 255))
 
         print(
             f"🦠 Leaf #{idx} | class={'healthy' if cls == 0 else 'infected'} "
             f"| severity={percent:.2f}% | conf={score:.2f}"
         )
 
+    renderer = AnnotationRenderer()
+    vis_frame = renderer.update(
+        frame, drawn_boxes, masks=masks, labels=labels, colors=colors
+    )
+
     # -----------------------------
     # Show and save result
     # -----------------------------
@@ -126,9 +105,13 @@ def main():
     base = os.path.splitext(os.path.basename(image_path))[0]
     out_path = os.path.join("output", f"{base}_vis.jpg")
 
-    cv2.imwrite(out_path, vis_frame)
+    with open(out_path, "wb") as f:
+        f.write(renderer.encode_jpeg(quality=95))
     print(f"💾 Visualization saved to: {out_path}")
 
+    if headless:
+        return
+
     cv2.imshow("Detections + Segmentation", vis_frame)
     print("Press any key in the image window to close...")
     cv2.waitKey(0)